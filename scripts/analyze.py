@@ -35,11 +35,13 @@ def analyze_transcripts(transcripts_file: Path):
     # TODO: Add your custom analysis logic here
     # For a complete example, see examples/food_reviews/extract_reviews.py
     
-    # Example: Count transcripts with original audio
-    original_audio_count = sum(
-        1 for t in transcripts 
-        if t.get('is_original_audio', False)
-    )
+    # Example: Count original audio and total length in a single pass
+    original_audio_count = 0
+    total_length = 0
+    for t in transcripts:
+        if t.get('is_original_audio', False):
+            original_audio_count += 1
+        total_length += len(t['transcript'])
     
     print(f"\nBasic statistics:")
     print(f"  Total transcripts: {len(transcripts)}")
@@ -48,7 +50,7 @@ def analyze_transcripts(transcripts_file: Path):
     
     # Example: Average transcript length
     if transcripts:
-        avg_length = sum(len(t['transcript']) for t in transcripts) / len(transcripts)
+        avg_length = total_length / len(transcripts)
         print(f"  Average transcript length: {avg_length:.0f} characters")
 
 
@@ -50,6 +50,12 @@ def main():
         action="store_true",
         help="Skip posts that already have thumbnail files (protects manual organization)"
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=16,
+        help="Number of concurrent downloads (default: 16)"
+    )
     
     args = parser.parse_args()
     
@@ -59,7 +65,8 @@ def main():
             output_dir=args.output_dir,
             thumbnail_type=args.type,
             update_mode=args.update,
-            skip_existing=args.skip_existing
+            skip_existing=args.skip_existing,
+            max_workers=args.workers
         )
         
         # Print summary
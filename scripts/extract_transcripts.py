@@ -16,7 +16,7 @@ from pathlib import Path
 # Add parent directory to path so we can import tiktools
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from tiktools import extract_transcripts
+from tiktools import extract_transcripts, DiskCache
 
 
 def main():
@@ -50,6 +50,22 @@ def main():
         action="store_true",
         help="Update mode: only process new posts"
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=16,
+        help="Number of concurrent subtitle downloads (default: 16)"
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Don't read or write the on-disk response cache (~/.cache/tiktools)"
+    )
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Ignore cached responses and fetch fresh copies"
+    )
     
     args = parser.parse_args()
     
@@ -59,31 +75,39 @@ def main():
             output_dir=args.output_dir,
             output_format=args.format,
             language=args.language,
-            update_mode=args.update
+            update_mode=args.update,
+            max_workers=args.workers,
+            cache=None if args.no_cache else DiskCache(refresh=args.refresh)
         )
         
-        # Print summary
-        print("\n" + "=" * 80)
-        print("SUMMARY")
-        print("=" * 80)
+        # Build the summary and print it in one write
+        summary = ["", "=" * 80, "SUMMARY", "=" * 80]
         
         if results.get('skipped_existing', 0) > 0:
-            print(f"Update mode:")
-            print(f"  Existing transcripts: {results.get('skipped_existing', 0)}")
-            print(f"  New transcripts: {results['transcripts_downloaded']}")
-            print(f"  Total transcripts: {len(results['transcripts'])}")
-            print()
+            summary += [
+                "Update mode:",
+                f"  Existing transcripts: {results.get('skipped_existing', 0)}",
+                f"  New transcripts: {results['transcripts_downloaded']}",
+                f"  Total transcripts: {len(results['transcripts'])}",
+                ""
+            ]
         
-        print(f"Total posts: {results['total_posts']}")
-        print(f"Transcripts found: {results['transcripts_found']}")
-        print(f"Transcripts downloaded: {results['transcripts_downloaded']}")
-        print(f"Failed: {results['failed']}")
+        summary += [
+            f"Total posts: {results['total_posts']}",
+            f"Transcripts found: {results['transcripts_found']}",
+            f"Transcripts downloaded: {results['transcripts_downloaded']}",
+            f"Failed: {results['failed']}"
+        ]
         
         if results['transcripts_downloaded'] > 0:
             total_chars = sum(len(t['transcript']) for t in results['transcripts'])
             avg_chars = total_chars / len(results['transcripts'])
-            print(f"\nTotal characters: {total_chars:,}")
-            print(f"Average per transcript: {avg_chars:.0f} characters")
+            summary += [
+                f"\nTotal characters: {total_chars:,}",
+                f"Average per transcript: {avg_chars:.0f} characters"
+            ]
+        
+        print("\n".join(summary))
         
         return 0
         
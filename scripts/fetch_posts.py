@@ -16,7 +16,7 @@ from pathlib import Path
 # Add parent directory to path so we can import tiktools
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from tiktools import fetch_user_posts
+from tiktools import fetch_user_posts, DiskCache
 
 
 def main():
@@ -41,7 +41,7 @@ def main():
         "--output",
         "-o",
         type=Path,
-        help="Output JSON file path (default: data/{username}/{username}_posts.json)"
+        help="Output JSON file path; end it in .gz to compress (default: data/{username}/{username}_posts.json)"
     )
     parser.add_argument(
         "--sandbox",
@@ -64,6 +64,16 @@ def main():
         default="cover",
         help="Type of thumbnail to download (default: cover)"
     )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Don't read or write the on-disk response cache (~/.cache/tiktools)"
+    )
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Ignore cached responses and fetch fresh copies"
+    )
     
     args = parser.parse_args()
     
@@ -82,7 +92,8 @@ def main():
             sandbox=args.sandbox,
             update_mode=args.update,
             download_thumbnails=args.download_thumbnails,
-            thumbnail_type=args.thumbnail_type
+            thumbnail_type=args.thumbnail_type,
+            cache=None if args.no_cache else DiskCache(refresh=args.refresh)
         )
         return 0
     except Exception as e:
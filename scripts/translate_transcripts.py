@@ -17,7 +17,7 @@ from pathlib import Path
 # Add parent directory to path so we can import tiktools
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from tiktools import translate_transcripts
+from tiktools import translate_transcripts, DiskCache
 
 
 def main():
@@ -61,6 +61,27 @@ def main():
         "--source-language",
         help="Source language code (auto-detected if not specified)"
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=16,
+        help="Number of concurrent translation requests (default: 16)"
+    )
+    parser.add_argument(
+        "--no-batch",
+        action="store_true",
+        help="Send every transcript in its own request instead of packing short ones together"
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Don't read or write the on-disk translation cache (~/.cache/tiktools)"
+    )
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Ignore cached translations and translate again"
+    )
     
     args = parser.parse_args()
     
@@ -72,42 +93,59 @@ def main():
             output_dir=args.output_dir,
             update_mode=args.update,
             estimate_only=args.estimate_only,
-            source_language=args.source_language
+            source_language=args.source_language,
+            max_workers=args.workers,
+            batch_requests=not args.no_batch,
+            cache=None if args.no_cache else DiskCache(refresh=args.refresh)
         )
         
-        # Print summary
-        print("\n" + "=" * 80)
-        print("SUMMARY")
-        print("=" * 80)
+        # Build the summary and print it in one write
+        summary = ["", "=" * 80, "SUMMARY", "=" * 80]
         
         if args.estimate_only:
-            print("COST ESTIMATE")
-            print(f"Total characters: {results['total_characters']:,}")
-            print(f"Target languages: {len(args.target)}")
-            print(f"Estimated cost: ${results['estimated_cost']:.4f} USD")
-            print("\nTo proceed with translation, run without --estimate-only")
+            summary += [
+                "COST ESTIMATE",
+                f"Total characters: {results['total_characters']:,}",
+                f"Target languages: {len(args.target)}",
+                f"Estimated cost: ${results['estimated_cost']:.4f} USD",
+                "\nTo proceed with translation, run without --estimate-only"
+            ]
+            print("\n".join(summary))
             return 0
         
         if results.get('skipped_existing', 0) > 0:
-            print(f"Update mode:")
-            print(f"  Existing translations: {results.get('skipped_existing', 0)}")
-            print(f"  New translations: {results['translations_created']}")
-            print()
+            summary += [
+                "Update mode:",
+                f"  Existing translations: {results.get('skipped_existing', 0)}",
+                f"  New translations: {results['translations_created']}",
+                ""
+            ]
         
-        print(f"Total transcripts: {results['total_transcripts']}")
-        print(f"Translations created: {results['translations_created']}")
-        print(f"  Service translated: {results['service_translated']}")
-        print(f"  TikTok subtitles used: {results['tiktok_subtitles_used']}")
-        print(f"Failed: {results['failed']}")
+        summary += [
+            f"Total transcripts: {results['total_transcripts']}",
+            f"Translations created: {results['translations_created']}",
+            f"  Service translated: {results['service_translated']}",
+            f"  TikTok subtitles used: {results['tiktok_subtitles_used']}",
+            f"  From cache: {results.get('cached_translations', 0)}",
+            f"Failed: {results['failed']}"
+        ]
         
         if results['estimated_cost'] > 0:
-            print(f"\nEstimated cost: ${results['estimated_cost']:.4f} USD")
+            summary.append(f"\nEstimated cost: ${results['estimated_cost']:.4f} USD")
+        
+        if results.get('retried_characters', 0) > 0:
+            summary.append(f"Re-sent after failed batches: {results['retried_characters']:,} characters "
+                           f"(may be billed twice)")
         
         if results['translations_created'] > 0:
             total_chars = sum(t['character_count'] for t in results['translations'])
             avg_chars = total_chars / len(results['translations'])
-            print(f"\nTotal characters translated: {total_chars:,}")
-            print(f"Average per translation: {avg_chars:.0f} characters")
+            summary += [
+                f"\nTotal characters translated: {total_chars:,}",
+                f"Average per translation: {avg_chars:.0f} characters"
+            ]
+        
+        print("\n".join(summary))
         
         return 0
         
@@ -1,9 +1,13 @@
 """Tests for TikAPI client wrapper."""
 
 import os
+import threading
+import time
 import pytest
 from unittest.mock import Mock, patch
 
+from tikapi import ResponseException
+
 from tiktools.api import TikAPIClient
 
 
@@ -80,4 +84,117 @@ class TestTikAPIClient:
         assert len(posts) == 2
         assert posts[0]['id'] == '1'
         assert posts[1]['id'] == '2'
-
+    
+    @patch('tiktools.api.TikAPI')
+    def test_get_posts_multiple_pages(self, mock_tikapi):
+        """Test that pagination follows next_items across pages."""
+        page_two = Mock()
+        page_two.json.return_value = {
+            'itemList': [{'id': '3', 'desc': 'Post 3'}],
+            'hasMore': False
+        }
+        page_one = Mock()
+        page_one.json.return_value = {
+            'itemList': [
+                {'id': '1', 'desc': 'Post 1'},
+                {'id': '2', 'desc': 'Post 2'}
+            ],
+            'hasMore': True
+        }
+        page_one.next_items.return_value = page_two
+        mock_api = Mock()
+        mock_api.public.posts.return_value = page_one
+        mock_tikapi.return_value = mock_api
+        
+        client = TikAPIClient(api_key='test_key')
+        
+        posts = list(client.get_posts('test_sec_uid'))
+        assert [p['id'] for p in posts] == ['1', '2', '3']
+        page_one.next_items.assert_called_once()
+        page_two.next_items.assert_not_called()
+        
+        # Each finished page reports the cursor for the next one
+        page_one.json.return_value['cursor'] = 2
+        cursors = []
+        list(client.get_posts('test_sec_uid', on_page=cursors.append))
+        assert cursors == ['2', None]
+        
+        # Without prefetch the same pages are returned
+        page_one.next_items.reset_mock()
+        posts = list(client.get_posts('test_sec_uid', prefetch=False))
+        assert [p['id'] for p in posts] == ['1', '2', '3']
+    
+    @patch('tiktools.api.TikAPI')
+    def test_get_posts_close_cancels_prefetch_wait(self, mock_tikapi):
+        """Test that stopping early wakes a prefetch waiting out the rate limit."""
+        page_one = Mock()
+        page_one.json.return_value = {'itemList': [{'id': '1'}, {'id': '2'}], 'hasMore': True}
+        page_one.headers = {'X-RateLimit-Remaining': '0', 'X-RateLimit-Reset': '60'}
+        mock_api = Mock()
+        mock_api.public.posts.return_value = page_one
+        mock_tikapi.return_value = mock_api
+        
+        client = TikAPIClient(api_key='test_key')
+        before = set(threading.enumerate())
+        posts = client.get_posts('test_sec_uid')
+        next(posts)
+        posts.close()
+        
+        started = time.monotonic()
+        for thread in set(threading.enumerate()) - before:
+            thread.join(timeout=5)
+            assert not thread.is_alive()
+        assert time.monotonic() - started < 5
+        page_one.next_items.assert_not_called()
+    
+    @patch('tiktools.api.TikAPI')
+    def test_get_posts_max_count_skips_next_page(self, mock_tikapi):
+        """Test that no further page is requested once max_count is reached."""
+        mock_response = Mock()
+        mock_response.json.return_value = {
+            'itemList': [{'id': '1'}, {'id': '2'}],
+            'hasMore': True
+        }
+        mock_api = Mock()
+        mock_api.public.posts.return_value = mock_response
+        mock_tikapi.return_value = mock_api
+        
+        client = TikAPIClient(api_key='test_key')
+        posts = list(client.get_posts('test_sec_uid', max_count=2))
+        
+        assert len(posts) == 2
+        mock_response.next_items.assert_not_called()
+    
+    @patch('tiktools.api.time.sleep')
+    @patch('tiktools.api.TikAPI')
+    def test_get_posts_retries_rate_limit(self, mock_tikapi, mock_sleep):
+        """Test that a 429 is retried after the Retry-After delay."""
+        rate_limited = ResponseException("Too many requests")
+        rate_limited.response = Mock(status_code=429, headers={'Retry-After': '2'})
+        page = Mock()
+        page.json.return_value = {'itemList': [{'id': '1'}], 'hasMore': False}
+        mock_api = Mock()
+        mock_api.public.posts.side_effect = [rate_limited, page]
+        mock_tikapi.return_value = mock_api
+        
+        client = TikAPIClient(api_key='test_key')
+        posts = list(client.get_posts('test_sec_uid'))
+        
+        assert [p['id'] for p in posts] == ['1']
+        mock_sleep.assert_called_once_with(2.0)
+    
+    @patch('tiktools.api.time.sleep')
+    @patch('tiktools.api.TikAPI')
+    def test_get_posts_other_errors_not_retried(self, mock_tikapi, mock_sleep):
+        """Test that non-429 errors are raised straight away."""
+        error = ResponseException("Not found")
+        error.response = Mock(status_code=404, headers={})
+        mock_api = Mock()
+        mock_api.public.posts.side_effect = error
+        mock_tikapi.return_value = mock_api
+        
+        client = TikAPIClient(api_key='test_key')
+        with pytest.raises(ResponseException):
+            list(client.get_posts('test_sec_uid'))
+        
+        mock_sleep.assert_not_called()
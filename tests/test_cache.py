@@ -0,0 +1,121 @@
+"""Tests for the on-disk response cache."""
+
+import time
+import pytest
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+from tiktools.cache import DiskCache, NO_EXPIRY
+from tiktools.api import TikAPIClient
+
+
+class TestDiskCache:
+    """Tests for DiskCache class."""
+    
+    def test_set_and_get(self, tmp_path):
+        """Test round-tripping a value."""
+        cache = DiskCache(root=tmp_path)
+        cache.set('profile', {'username': 'test_user'}, {'secUid': 'abc', 'nickname': 'Tést'})
+        
+        assert cache.get('profile', {'username': 'test_user'}) == {'secUid': 'abc', 'nickname': 'Tést'}
+    
+    def test_get_missing(self, tmp_path):
+        """Test that unknown keys miss."""
+        cache = DiskCache(root=tmp_path)
+        cache.set('profile', {'username': 'test_user'}, 'value')
+        
+        assert cache.get('profile', {'username': 'other_user'}) is None
+        assert cache.get('subtitle', {'username': 'test_user'}) is None
+    
+    def test_get_expired(self, tmp_path):
+        """Test that entries older than the ttl miss."""
+        cache = DiskCache(root=tmp_path, ttl=60)
+        cache.set('subtitle', {'url': 'u'}, 'value')
+        
+        with patch('tiktools.cache.time.time', return_value=time.time() + 120):
+            assert cache.get('subtitle', {'url': 'u'}) is None
+            assert cache.get('subtitle', {'url': 'u'}, ttl=300) == 'value'
+    
+    def test_get_no_expiry(self, tmp_path):
+        """Test that NO_EXPIRY overrides the cache's default ttl."""
+        cache = DiskCache(root=tmp_path)
+        cache.set('translation', {'text': 'hola'}, 'hello')
+        
+        with patch('tiktools.cache.time.time', return_value=time.time() + 2 * 86400):
+            assert cache.get('translation', {'text': 'hola'}) is None
+            assert cache.get('translation', {'text': 'hola'}, ttl=NO_EXPIRY) == 'hello'
+    
+    def test_get_stale_ignores_ttl(self, tmp_path):
+        """Test that expired entries are still returned with their meta."""
+        cache = DiskCache(root=tmp_path, ttl=60)
+        cache.set('subtitle', {'url': 'u'}, 'value', meta={'etag': '"v1"'})
+        
+        with patch('tiktools.cache.time.time', return_value=time.time() + 120):
+            assert cache.get('subtitle', {'url': 'u'}) is None
+            assert cache.get_stale('subtitle', {'url': 'u'}) == ('value', {'etag': '"v1"'})
+        
+        assert cache.get_stale('subtitle', {'url': 'other'}) is None
+    
+    def test_refresh_ignores_entries(self, tmp_path):
+        """Test that refresh skips reads but still writes."""
+        DiskCache(root=tmp_path).set('subtitle', {'url': 'u'}, 'old')
+        
+        cache = DiskCache(root=tmp_path, refresh=True)
+        assert cache.get('subtitle', {'url': 'u'}) is None
+        cache.set('subtitle', {'url': 'u'}, 'new')
+        
+        assert DiskCache(root=tmp_path).get('subtitle', {'url': 'u'}) == 'new'
+    
+    def test_set_unwritable_root(self, tmp_path):
+        """Test that a cache that can't be written to is skipped, not fatal."""
+        # A file where the cache directory should be can't be written to, even as root
+        root = tmp_path / "cache"
+        root.write_text('not a directory')
+        cache = DiskCache(root=root)
+        
+        cache.set('subtitle', {'url': 'u'}, 'value')
+        
+        assert cache.get('subtitle', {'url': 'u'}) is None
+        assert list(tmp_path.rglob('*.tmp')) == []
+
+
+class TestCachedProfile:
+    """Tests for profile caching in TikAPIClient."""
+    
+    @patch('tiktools.api.TikAPI')
+    def test_get_profile_uses_cache(self, mock_tikapi, tmp_path):
+        """Test that a second lookup is served from the cache."""
+        mock_api = Mock()
+        mock_api.public.check.return_value.json.return_value = {
+            'userInfo': {
+                'user': {'nickname': 'Test User', 'secUid': 'test_sec_uid'},
+                'stats': {'videoCount': 100, 'followerCount': 5000}
+            }
+        }
+        mock_tikapi.return_value = mock_api
+        
+        client = TikAPIClient(api_key='test_key', cache=DiskCache(root=tmp_path))
+        first = client.get_profile('test_user')
+        second = client.get_profile('test_user')
+        
+        assert first == second
+        assert second['secUid'] == 'test_sec_uid'
+        mock_api.public.check.assert_called_once()
+    
+    @patch('tiktools.api.TikAPI')
+    def test_get_profile_unwritable_cache(self, mock_tikapi, tmp_path):
+        """Test that the profile is still returned when the cache can't be written."""
+        mock_api = Mock()
+        mock_api.public.check.return_value.json.return_value = {
+            'userInfo': {
+                'user': {'nickname': 'Test User', 'secUid': 'test_sec_uid'},
+                'stats': {'videoCount': 100, 'followerCount': 5000}
+            }
+        }
+        mock_tikapi.return_value = mock_api
+        root = tmp_path / "cache"
+        root.write_text('not a directory')
+        
+        client = TikAPIClient(api_key='test_key', cache=DiskCache(root=root))
+        
+        assert client.get_profile('test_user')['secUid'] == 'test_sec_uid'
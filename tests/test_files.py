@@ -0,0 +1,37 @@
+"""Tests for output file helpers."""
+
+import os
+import pytest
+from pathlib import Path
+
+from tiktools._files import write_if_changed, write_text_if_changed
+from tiktools._json import write_json
+
+
+class TestWriteIfChanged:
+    """Tests for skipping identical rewrites."""
+    
+    def test_write_if_changed(self, tmp_path):
+        """Test that identical content is not rewritten and new content is."""
+        path = tmp_path / "post.txt"
+        
+        assert write_text_if_changed(path, "héllo\n") is True
+        os.utime(path, ns=(0, 0))
+        
+        assert write_text_if_changed(path, "héllo\n") is False
+        assert path.stat().st_mtime_ns == 0
+        
+        assert write_if_changed(path, b"changed") is True
+        assert path.read_bytes() == b"changed"
+    
+    def test_write_json_unchanged(self, tmp_path):
+        """Test that write_json leaves an identical file untouched."""
+        path = tmp_path / "data.json"
+        write_json(path, {'posts': [1, 2]})
+        os.utime(path, ns=(0, 0))
+        
+        write_json(path, {'posts': [1, 2]})
+        assert path.stat().st_mtime_ns == 0
+        
+        write_json(path, {'posts': [1, 2, 3]})
+        assert path.stat().st_mtime_ns != 0
@@ -0,0 +1,25 @@
+"""Tests for the shared HTTP session helpers."""
+
+from tiktools._http import create_session, ensure_pool_size
+
+
+class TestEnsurePoolSize:
+    """Tests for growing a session's connection pool."""
+    
+    def test_grows_pool_for_more_workers(self):
+        """Test that the pool is enlarged to cover the worker count."""
+        session = create_session(pool_maxsize=4)
+        
+        ensure_pool_size(session, 64)
+        
+        assert session.get_adapter('https://')._pool_maxsize == 64
+        assert session.get_adapter('http://')._pool_maxsize == 64
+    
+    def test_keeps_larger_pool(self):
+        """Test that a pool already big enough is left alone."""
+        session = create_session(pool_maxsize=32)
+        adapter = session.get_adapter('https://')
+        
+        ensure_pool_size(session, 8)
+        
+        assert session.get_adapter('https://') is adapter
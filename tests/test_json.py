@@ -0,0 +1,181 @@
+"""Tests for JSON helpers."""
+
+import gzip
+import json
+import pytest
+from pathlib import Path
+from unittest.mock import patch
+
+from tiktools import _json
+
+
+@pytest.fixture(params=['default', 'stdlib'])
+def json_backend(request):
+    """Run a test with the optional accelerators and with the stdlib fallback."""
+    if request.param == 'stdlib':
+        with patch.object(_json, 'orjson', None), patch.object(_json, 'ijson', None):
+            yield request.param
+    else:
+        yield request.param
+
+
+class TestDumps:
+    """Tests for JSON encoding."""
+    
+    def test_dumps_matches_stdlib(self, json_backend):
+        """Test that output matches json.dumps(indent=2, ensure_ascii=False)."""
+        data = {'username': 'tést', 'count': 2, 'ratio': 0.5, 'posts': [{'id': '1', 'ok': True}], 'none': None}
+        
+        assert _json.dumps(data).decode('utf-8') == json.dumps(data, indent=2, ensure_ascii=False)
+    
+    def test_dumps_keeps_nan_and_infinity(self, json_backend):
+        """Test that non-finite floats are written as NaN/Infinity, not null."""
+        data = {'ratio': float('nan'), 'limit': float('inf'), 'posts': [{'score': float('-inf')}]}
+        
+        assert _json.dumps(data).decode('utf-8') == json.dumps(data, indent=2, ensure_ascii=False)
+    
+    def test_dumps_exponent_floats(self, json_backend):
+        """Test that exponent floats read back unchanged, whatever their spelling."""
+        data = {'big': 1e20, 'small': 1.5e-7}
+        text = _json.dumps(data).decode('utf-8')
+        
+        assert json.loads(text) == data
+        if json_backend == 'default' and _json.orjson is not None:
+            assert '"big": 1e20' in text and '"small": 1.5e-7' in text
+        else:
+            assert '"big": 1e+20' in text and '"small": 1.5e-07' in text
+
+
+class TestWriteJson:
+    """Tests for atomic JSON writes."""
+    
+    def test_write_json_replaces_file(self, tmp_path):
+        """Test that the file is replaced and no temp file is left behind."""
+        path = tmp_path / "posts.json"
+        path.write_text('old', encoding='utf-8')
+        
+        _json.write_json(path, {'posts': []})
+        
+        assert json.loads(path.read_text(encoding='utf-8')) == {'posts': []}
+        assert [p.name for p in tmp_path.iterdir()] == ['posts.json']
+    
+    def test_write_json_failure_keeps_original(self, tmp_path):
+        """Test that a failed write leaves the existing file intact."""
+        path = tmp_path / "posts.json"
+        path.write_text('{"posts": [1]}', encoding='utf-8')
+        
+        with patch.object(_json, 'dumps', side_effect=TypeError("not serializable")):
+            with pytest.raises(TypeError):
+                _json.write_json(path, {'posts': [object()]})
+        
+        assert path.read_text(encoding='utf-8') == '{"posts": [1]}'
+        assert [p.name for p in tmp_path.iterdir()] == ['posts.json']
+    
+    def test_write_json_failure_removes_temp_file(self, tmp_path):
+        """Test that a write failing after the temp file exists cleans it up."""
+        path = tmp_path / "posts.json"
+        path.write_text('{"posts": [1]}', encoding='utf-8')
+        
+        with patch.object(_json.os, 'replace', side_effect=OSError("disk full")):
+            with pytest.raises(OSError):
+                _json.write_json(path, {'posts': [2]})
+        
+        assert path.read_text(encoding='utf-8') == '{"posts": [1]}'
+        assert list(tmp_path.glob('*.tmp')) == []
+        assert [p.name for p in tmp_path.iterdir()] == ['posts.json']
+
+
+class TestLoadJson:
+    """Tests for reading whole JSON files."""
+    
+    def test_load_json(self, json_backend, sample_posts_data, tmp_path):
+        """Test that a file written by write_json reads back unchanged."""
+        path = tmp_path / "posts.json"
+        _json.write_json(path, sample_posts_data)
+        
+        assert _json.load_json(path) == sample_posts_data
+    
+    def test_load_json_nan(self, json_backend, tmp_path):
+        """Test that values orjson rejects still load through the stdlib."""
+        path = tmp_path / "stats.json"
+        path.write_text('{"ratio": NaN}', encoding='utf-8')
+        
+        assert str(_json.load_json(path)['ratio']) == 'nan'
+
+
+class TestGzip:
+    """Tests for transparent gzip support."""
+    
+    def test_gzip_round_trip(self, json_backend, sample_posts_data, tmp_path):
+        """Test that .gz paths are compressed on write and detected on read."""
+        path = tmp_path / "posts.json.gz"
+        _json.write_json(path, sample_posts_data)
+        
+        assert path.read_bytes()[:2] == b'\x1f\x8b'
+        assert _json.load_json(path) == sample_posts_data
+        
+        header, posts = _json.load_records(path, 'posts')
+        assert header['username'] == 'test_user'
+        assert posts == sample_posts_data['posts']
+    
+    def test_gzip_detected_without_suffix(self, json_backend, tmp_path):
+        """Test that compressed content is read by its magic bytes, not its name."""
+        path = tmp_path / "posts.json"
+        path.write_bytes(gzip.compress(b'{"username": "a", "posts": [{"id": "1"}]}'))
+        
+        assert _json.load_records(path, 'posts') == ({'username': 'a'}, [{'id': '1'}])
+
+
+class TestJsonLines:
+    """Tests for JSON Lines helpers."""
+    
+    def test_dumps_line_round_trip(self, json_backend, tmp_path):
+        """Test that records written with dumps_line are read back in order."""
+        path = tmp_path / "records.jsonl"
+        records = [{'post_id': '1', 'text': 'héllo'}, {'post_id': '2', 'text': 'a\nb'}]
+        path.write_bytes(b''.join(_json.dumps_line(r) for r in records))
+        
+        assert path.read_bytes().count(b'\n') == 2
+        assert _json.read_jsonl(path) == records
+    
+    def test_read_jsonl_ignores_truncated_line(self, tmp_path):
+        """Test that a partially written last line is skipped."""
+        path = tmp_path / "records.jsonl"
+        path.write_text('{"post_id": "1"}\n{"post_id": "2', encoding='utf-8')
+        
+        assert _json.read_jsonl(path) == [{'post_id': '1'}]
+
+
+class TestLoadRecords:
+    """Tests for loading record lists."""
+    
+    def test_load_records(self, json_backend, sample_posts_data, tmp_path):
+        """Test that header fields and records are returned."""
+        path = tmp_path / "posts.json"
+        path.write_text(json.dumps(sample_posts_data), encoding='utf-8')
+        
+        header, posts = _json.load_records(path, 'posts')
+        
+        assert header['username'] == 'test_user'
+        assert header['total_videos'] == 100
+        assert 'posts' not in header
+        assert posts == sample_posts_data['posts']
+    
+    def test_load_records_transform(self, json_backend, sample_posts_data, tmp_path):
+        """Test that records are passed through the transform."""
+        path = tmp_path / "posts.json"
+        path.write_text(json.dumps(sample_posts_data), encoding='utf-8')
+        
+        header, ids = _json.load_records(path, 'posts', lambda p: p['id'])
+        
+        assert ids == ['7575304937580547342']
+    
+    def test_load_records_missing_key(self, json_backend, tmp_path):
+        """Test files without the record list."""
+        path = tmp_path / "empty.json"
+        path.write_text(json.dumps({'username': 'test_user'}), encoding='utf-8')
+        
+        header, posts = _json.load_records(path, 'posts')
+        
+        assert header == {'username': 'test_user'}
+        assert posts == []
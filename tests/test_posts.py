@@ -5,7 +5,7 @@ import pytest
 from pathlib import Path
 from unittest.mock import Mock, patch, MagicMock
 
-from tiktools.posts import fetch_user_posts
+from tiktools.posts import fetch_user_posts, _read_cursor
 
 
 class TestFetchUserPosts:
@@ -105,4 +105,76 @@ class TestFetchUserPosts:
         assert result['fetched_count'] == 3
         assert len(result['posts']) == 3
         assert result['new_posts'] == 1
-
+        assert [p['id'] for p in result['posts']] == ['new_post_1', 'old_post_2', 'old_post_1']
+    
+    
+    @patch('tiktools.posts.TikAPIClient')
+    def test_fetch_user_posts_update_uses_cursor(self, mock_client_class, sample_post, temp_output_dir):
+        """Test that a saved cursor drives the next update run."""
+        mock_client = Mock()
+        mock_client.get_profile.return_value = {
+            'nickname': 'Test User',
+            'videoCount': 2,
+            'secUid': 'test_sec_uid'
+        }
+        mock_client_class.return_value = mock_client
+        output_file = temp_output_dir / "posts.json"
+        
+        first = dict(sample_post, id='post_1', createTime=1000)
+        mock_client.get_posts.return_value = iter([first])
+        fetch_user_posts(username='test_user', api_key='test_key', output_file=output_file)
+        
+        cursor_file = temp_output_dir / "posts.cursor.json"
+        with open(cursor_file, 'r') as f:
+            assert json.load(f)['most_recent_time'] == 1000
+        
+        second = dict(sample_post, id='post_2', createTime=2000)
+        mock_client.get_posts.return_value = iter([second, first])
+        result = fetch_user_posts(
+            username='test_user',
+            api_key='test_key',
+            output_file=output_file,
+            update_mode=True
+        )
+        
+        assert result['new_posts'] == 1
+        assert [p['id'] for p in result['posts']] == ['post_2', 'post_1']
+        with open(cursor_file, 'r') as f:
+            assert json.load(f)['recent_ids'] == ['post_2', 'post_1']
+    
+    @pytest.mark.parametrize('content', ['[1, 2]', 'null', '42'])
+    def test_read_cursor_not_an_object(self, content, temp_output_dir):
+        """Test that a cursor sidecar holding valid non-object JSON is ignored."""
+        output_file = temp_output_dir / "posts.json"
+        output_file.write_text('{"posts": []}', encoding='utf-8')
+        (temp_output_dir / "posts.cursor.json").write_text(content, encoding='utf-8')
+        
+        assert _read_cursor(output_file) is None
+    
+    @patch('tiktools.posts.TikAPIClient')
+    def test_fetch_user_posts_resumes_interrupted_fetch(self, mock_client_class, temp_output_dir):
+        """Test that spooled posts are kept and fetching continues from the saved cursor."""
+        output_file = temp_output_dir / "posts.json"
+        spool_path = temp_output_dir / "posts.partial.jsonl"
+        spool_path.write_text(
+            '{"id": "post_1", "createTime": 3000}\n'
+            '{"id": "post_2", "createTime": 2000}\n'
+            '{"_cursor": "30"}\n'
+            '{"id": "half_page", "createTime": 1500}\n',
+            encoding='utf-8'
+        )
+        
+        mock_client = Mock()
+        mock_client.get_profile.return_value = {
+            'nickname': 'Test User',
+            'videoCount': 3,
+            'secUid': 'test_sec_uid'
+        }
+        mock_client.get_posts.return_value = iter([{'id': 'post_3', 'createTime': 1000}])
+        mock_client_class.return_value = mock_client
+        
+        result = fetch_user_posts(username='test_user', api_key='test_key', output_file=output_file)
+        
+        assert [p['id'] for p in result['posts']] == ['post_1', 'post_2', 'post_3']
+        assert mock_client.get_posts.call_args.kwargs['cursor'] == '30'
+        assert not spool_path.exists()
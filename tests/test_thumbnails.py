@@ -0,0 +1,179 @@
+"""Tests for thumbnail downloading functionality."""
+
+import json
+import pytest
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+from tiktools.thumbnails import (
+    get_thumbnail_url,
+    detect_image_extension,
+    download_thumbnail,
+    download_thumbnails
+)
+
+
+class TestGetThumbnailUrl:
+    """Tests for thumbnail URL extraction."""
+    
+    def test_get_thumbnail_url_cover(self):
+        """Test extraction of a top-level video field."""
+        post = {'video': {'cover': 'https://example.com/cover.jpg'}}
+        
+        assert get_thumbnail_url(post, "cover") == 'https://example.com/cover.jpg'
+    
+    def test_get_thumbnail_url_nested(self):
+        """Test extraction of a nested zoom cover."""
+        post = {'video': {'zoomCover': {'480': 'https://example.com/480.jpg'}}}
+        
+        assert get_thumbnail_url(post, "zoom_480") == 'https://example.com/480.jpg'
+    
+    def test_get_thumbnail_url_missing(self):
+        """Test posts without the requested thumbnail."""
+        assert get_thumbnail_url({'video': {}}, "origin") is None
+        assert get_thumbnail_url({}, "zoom_240") is None
+    
+    def test_get_thumbnail_url_invalid_type(self):
+        """Test that unknown thumbnail types raise ValueError."""
+        with pytest.raises(ValueError, match="Invalid thumbnail_type"):
+            get_thumbnail_url({}, "huge")
+
+
+class TestDetectImageExtension:
+    """Tests for image extension detection."""
+    
+    def test_detect_extension_from_url(self):
+        """Test explicit extensions in the URL path."""
+        assert detect_image_extension("https://example.com/a.png?x=1") == '.png'
+        assert detect_image_extension("https://example.com/a.jpeg") == '.jpeg'
+    
+    def test_detect_extension_from_headers(self):
+        """Test content-type fallback."""
+        headers = {'content-type': 'image/webp'}
+        assert detect_image_extension("https://example.com/a", headers) == '.webp'
+    
+    def test_detect_extension_format_hint(self):
+        """Test TikTok-style format hints in the URL path and content-type parameters."""
+        assert detect_image_extension("https://example.com/obj~tplv-avif:300:400?x=webp") == '.avif'
+        assert detect_image_extension("https://example.com/a", {'content-type': 'image/jpeg; q=1'}) == '.jpg'
+    
+    def test_detect_extension_default(self):
+        """Test default extension for TikTok URLs without hints."""
+        assert detect_image_extension("https://example.com/a") == '.jpg'
+
+
+class TestDownloadThumbnail:
+    """Tests for single thumbnail downloads."""
+    
+    def test_download_thumbnail_with_session(self, tmp_path):
+        """Test that an injected session is used and the image is saved."""
+        session = Mock()
+        session.get.return_value.content = b'image'
+        output_path = tmp_path / "thumbs" / "1.jpg"
+        
+        assert download_thumbnail("https://example.com/1.jpg", output_path, session=session)
+        
+        assert output_path.read_bytes() == b'image'
+        session.get.assert_called_once()
+    
+    @patch('tiktools.thumbnails._session.get')
+    def test_download_thumbnail_failure(self, mock_get, tmp_path):
+        """Test that network errors return False without writing a file."""
+        mock_get.side_effect = Exception("Network error")
+        output_path = tmp_path / "1.jpg"
+        
+        assert download_thumbnail("https://example.com/1.jpg", output_path) is False
+        assert not output_path.exists()
+
+
+class TestDownloadThumbnails:
+    """Tests for download_thumbnails function."""
+    
+    @patch('tiktools.thumbnails.download_thumbnail')
+    def test_download_thumbnails_basic(self, mock_download, sample_posts_data, temp_output_dir):
+        """Test that every post with a thumbnail is downloaded and recorded."""
+        posts = []
+        for i in range(5):
+            post = dict(sample_posts_data['posts'][0])
+            post['id'] = f'post_{i}'
+            post['video'] = {'cover': f'https://example.com/{i}.jpg'}
+            posts.append(post)
+        posts.append({'id': 'no_cover', 'video': {}})
+        sample_posts_data['posts'] = posts
+        
+        posts_file = temp_output_dir / "posts.json"
+        with open(posts_file, 'w') as f:
+            json.dump(sample_posts_data, f)
+        
+        def fake_download(url, output_path, *args, **kwargs):
+            output_path.write_bytes(b'image')
+            return True
+        
+        mock_download.side_effect = fake_download
+        
+        results = download_thumbnails(posts_file, max_workers=3)
+        
+        assert results['thumbnails_found'] == 5
+        assert results['thumbnails_downloaded'] == 5
+        assert results['failed'] == 1
+        assert [t['post_id'] for t in results['thumbnails']] == [f'post_{i}' for i in range(5)]
+        assert mock_download.call_count == 5
+        
+        thumbnails_json = temp_output_dir / "thumbnails" / "test_user_thumbnails.json"
+        with open(thumbnails_json, 'r') as f:
+            saved_data = json.load(f)
+        assert len(saved_data['thumbnails']) == 5
+    
+    @patch('tiktools.thumbnails.download_thumbnail')
+    def test_download_thumbnails_failure(self, mock_download, sample_posts_data, temp_output_dir):
+        """Test that failed downloads are counted and not recorded."""
+        sample_posts_data['posts'][0]['video'] = {'cover': 'https://example.com/0.jpg'}
+        posts_file = temp_output_dir / "posts.json"
+        with open(posts_file, 'w') as f:
+            json.dump(sample_posts_data, f)
+        
+        mock_download.return_value = False
+        
+        results = download_thumbnails(posts_file)
+        
+        assert results['thumbnails_downloaded'] == 0
+        assert results['failed'] == 1
+        assert results['thumbnails'] == []
+    
+    @patch('tiktools.thumbnails.download_thumbnail')
+    def test_download_thumbnails_nested_type(self, mock_download, sample_posts_data, temp_output_dir):
+        """Test that nested thumbnail fields survive post trimming."""
+        sample_posts_data['posts'][0]['video'] = {'zoomCover': {'720': 'https://example.com/720.jpg'}}
+        posts_file = temp_output_dir / "posts.json"
+        with open(posts_file, 'w') as f:
+            json.dump(sample_posts_data, f)
+        
+        mock_download.side_effect = lambda url, output_path, *args, **kwargs: output_path.write_bytes(b'image') or True
+        
+        results = download_thumbnails(posts_file, thumbnail_type="zoom_720")
+        
+        assert results['thumbnails_downloaded'] == 1
+        assert results['thumbnails'][0]['thumbnail_url'] == 'https://example.com/720.jpg'
+    
+    @patch('tiktools.thumbnails.download_thumbnail')
+    def test_download_thumbnails_skip_existing(self, mock_download, sample_posts_data, temp_output_dir):
+        """Test that posts with a thumbnail already on disk are not downloaded."""
+        sample_posts_data['posts'] = [
+            {'id': f'post_{i}', 'video': {'cover': f'https://example.com/{i}.jpg'}}
+            for i in range(2)
+        ]
+        posts_file = temp_output_dir / "posts.json"
+        with open(posts_file, 'w') as f:
+            json.dump(sample_posts_data, f)
+        
+        output_dir = temp_output_dir / "thumbnails"
+        output_dir.mkdir()
+        (output_dir / "post_0.jpg").write_bytes(b'edited')
+        
+        mock_download.side_effect = lambda url, output_path, *args, **kwargs: output_path.write_bytes(b'image') or True
+        
+        results = download_thumbnails(posts_file, skip_existing=True)
+        
+        assert results['skipped_existing'] == 1
+        assert results['thumbnails_downloaded'] == 1
+        assert (output_dir / "post_0.jpg").read_bytes() == b'edited'
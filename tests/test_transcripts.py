@@ -8,8 +8,10 @@ from unittest.mock import Mock, patch, mock_open
 from tiktools.transcripts import (
     parse_webvtt,
     download_subtitle,
-    get_best_subtitle
+    get_best_subtitle,
+    extract_transcripts
 )
+from tiktools.cache import DiskCache
 
 
 class TestParseWebVTT:
@@ -35,12 +37,25 @@ class TestParseWebVTT:
         content = "WEBVTT\n\nJust some text without timestamps"
         result = parse_webvtt(content)
         assert "Just some text" in result
+    
+    def test_parse_webvtt_cue_numbers_and_crlf(self):
+        """Test that cue numbers are dropped and CRLF line endings are handled."""
+        content = (
+            "WEBVTT\r\n\r\n1\r\n00:00:00.000 --> 00:00:02.000\r\n"
+            "  First line  \r\n\r\n2\r\n00:00:02.000 --> 00:00:04.000\r\nSecond line\r\n"
+        )
+        result = parse_webvtt(content)
+        assert result == "First line Second line"
+    
+    def test_parse_webvtt_without_header(self):
+        """Test that text before a WEBVTT header is ignored."""
+        assert parse_webvtt("No header here") == ""
 
 
 class TestDownloadSubtitle:
     """Tests for subtitle downloading."""
     
-    @patch('tiktools.transcripts.requests.get')
+    @patch('tiktools.transcripts._session.get')
     def test_download_subtitle_success(self, mock_get, sample_webvtt):
         """Test successful subtitle download."""
         mock_response = Mock()
@@ -53,7 +68,48 @@ class TestDownloadSubtitle:
         assert result == sample_webvtt
         mock_get.assert_called_once()
     
-    @patch('tiktools.transcripts.requests.get')
+    @patch('tiktools.transcripts._session.get')
+    def test_download_subtitle_cached(self, mock_get, sample_webvtt, tmp_path):
+        """Test that a cached subtitle is not downloaded again."""
+        mock_response = Mock()
+        mock_response.text = sample_webvtt
+        mock_response.status_code = 200
+        mock_response.headers = {}
+        mock_response.raise_for_status = Mock()
+        mock_get.return_value = mock_response
+        cache = DiskCache(root=tmp_path)
+        
+        first = download_subtitle("https://example.com/subtitle.vtt", cache=cache)
+        second = download_subtitle("https://example.com/subtitle.vtt", cache=cache)
+        
+        assert first == second == sample_webvtt
+        mock_get.assert_called_once()
+    
+    @patch('tiktools.transcripts._session.get')
+    def test_download_subtitle_unwritable_cache(self, mock_get, sample_webvtt, tmp_path):
+        """Test that a cache write failure doesn't lose the downloaded subtitle."""
+        mock_get.return_value = Mock(text=sample_webvtt, status_code=200, headers={})
+        root = tmp_path / "cache"
+        root.write_text('not a directory')
+        
+        result = download_subtitle("https://example.com/subtitle.vtt", cache=DiskCache(root=root))
+        
+        assert result == sample_webvtt
+    
+    @patch('tiktools.transcripts._session.get')
+    def test_download_subtitle_revalidates_expired(self, mock_get, sample_webvtt, tmp_path):
+        """Test that an expired entry is revalidated and reused on 304."""
+        url = "https://example.com/subtitle.vtt"
+        cache = DiskCache(root=tmp_path, ttl=0)
+        cache.set('subtitle', {'url': url}, sample_webvtt, meta={'etag': '"abc"', 'last_modified': None})
+        mock_get.return_value = Mock(status_code=304)
+        
+        result = download_subtitle(url, cache=cache)
+        
+        assert result == sample_webvtt
+        assert mock_get.call_args.kwargs['headers'] == {'If-None-Match': '"abc"'}
+    
+    @patch('tiktools.transcripts._session.get')
     def test_download_subtitle_failure(self, mock_get):
         """Test subtitle download failure."""
         mock_get.side_effect = Exception("Network error")
@@ -110,6 +166,22 @@ class TestGetBestSubtitle:
         assert result is not None
         assert result['Source'] == 'ASR'
     
+    def test_get_best_subtitle_fallback_preferred_mt(self):
+        """Test that a preferred-language MT subtitle is used when there is no ASR."""
+        post = {
+            'video': {
+                'subtitleInfos': [
+                    {'LanguageCodeName': 'spa-ES', 'Source': 'MT', 'Url': 'https://example.com/spa-mt.vtt'},
+                    {'LanguageCodeName': 'eng-US', 'Source': 'MT', 'Url': 'https://example.com/eng-mt.vtt'}
+                ]
+            }
+        }
+        
+        result = get_best_subtitle(post, preferred_language="eng")
+        
+        assert result is not None
+        assert result['Url'] == 'https://example.com/eng-mt.vtt'
+    
     def test_get_best_subtitle_no_subtitles(self):
         """Test handling of posts without subtitles."""
         post = {'video': {}}
@@ -142,3 +214,78 @@ class TestGetBestSubtitle:
         assert result is not None
         assert result['Source'] == 'ASR'
 
+
+class TestExtractTranscripts:
+    """Tests for extract_transcripts function."""
+    
+    @patch('tiktools.transcripts.download_subtitle')
+    def test_extract_transcripts_basic(self, mock_download, sample_posts_data, sample_webvtt, temp_output_dir):
+        """Test that subtitles are downloaded, parsed and saved in post order."""
+        base_post = sample_posts_data['posts'][0]
+        posts = []
+        for i in range(4):
+            post = dict(base_post)
+            post['id'] = f'post_{i}'
+            posts.append(post)
+        posts.append({'id': 'no_subs', 'video': {}})
+        sample_posts_data['posts'] = posts
+        
+        posts_file = temp_output_dir / "posts.json"
+        with open(posts_file, 'w') as f:
+            json.dump(sample_posts_data, f)
+        
+        mock_download.return_value = sample_webvtt
+        
+        results = extract_transcripts(posts_file, max_workers=2)
+        
+        assert results['transcripts_found'] == 4
+        assert results['transcripts_downloaded'] == 4
+        assert results['failed'] == 1
+        assert [t['post_id'] for t in results['transcripts']] == [f'post_{i}' for i in range(4)]
+        assert "Hello everyone" in results['transcripts'][0]['transcript']
+        
+        transcripts_dir = temp_output_dir / "transcripts"
+        assert (transcripts_dir / "post_0.txt").exists()
+        with open(transcripts_dir / "test_user_transcripts.json", 'r') as f:
+            saved_data = json.load(f)
+        assert saved_data['summary']['transcripts_downloaded'] == 4
+    
+    @patch('tiktools.transcripts.download_subtitle')
+    def test_extract_transcripts_update_mode(self, mock_download, sample_posts_data, sample_webvtt, temp_output_dir):
+        """Test that update mode skips posts that were already transcribed."""
+        posts_file = temp_output_dir / "posts.json"
+        with open(posts_file, 'w') as f:
+            json.dump(sample_posts_data, f)
+        
+        mock_download.return_value = sample_webvtt
+        extract_transcripts(posts_file)
+        
+        results = extract_transcripts(posts_file, update_mode=True)
+        
+        assert results['skipped_existing'] == 1
+        assert results['transcripts_downloaded'] == 0
+        assert len(results['transcripts']) == 1
+        assert mock_download.call_count == 1
+    
+    @patch('tiktools.transcripts.download_subtitle')
+    def test_extract_transcripts_recovers_interrupted_run(self, mock_download, sample_posts_data, sample_webvtt, temp_output_dir):
+        """Test that an interrupted run's journal is replayed in update mode."""
+        posts_file = temp_output_dir / "posts.json"
+        with open(posts_file, 'w') as f:
+            json.dump(sample_posts_data, f)
+        
+        # Simulate a run that died after journaling the post but before saving the JSON
+        output_dir = temp_output_dir / "transcripts"
+        output_dir.mkdir()
+        journal_path = output_dir / "test_user_transcripts.partial.jsonl"
+        journal_path.write_text(
+            json.dumps({'post_id': '7575304937580547342', 'transcript': 'saved earlier'}) + '\n{"post_id": "trunc',
+            encoding='utf-8'
+        )
+        
+        results = extract_transcripts(posts_file, update_mode=True)
+        
+        assert results['skipped_existing'] == 1
+        assert results['transcripts'][0]['transcript'] == 'saved earlier'
+        mock_download.assert_not_called()
+        assert not journal_path.exists()
@@ -0,0 +1,389 @@
+"""Tests for transcript translation functionality."""
+
+import json
+import re
+import threading
+import time
+import pytest
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+from tiktools.cache import DiskCache
+from tiktools.translation import (
+    BatchSplitError,
+    TranslationService,
+    AWSTranslateService,
+    normalize_language_code,
+    check_tiktok_subtitles,
+    translate_transcripts,
+    _split_for_translate
+)
+
+
+class FakeTranslationService(TranslationService):
+    """In-memory translation service that records its calls."""
+    
+    def __init__(self, fail_on=None):
+        self.calls = []
+        self.fail_on = fail_on or set()
+        self._lock = threading.Lock()
+    
+    def translate(self, text, source_language, target_language):
+        with self._lock:
+            self.calls.append((text, source_language, target_language))
+        if text in self.fail_on:
+            raise RuntimeError("service error")
+        return f"[{target_language}] {text}"
+    
+    def detect_language(self, text):
+        return 'en'
+    
+    def estimate_cost(self, char_count):
+        return char_count / 1_000_000
+
+
+@pytest.fixture
+def transcripts_file(temp_output_dir):
+    """Transcripts JSON file with a few Spanish transcripts."""
+    data = {
+        'username': 'test_user',
+        'transcripts': [
+            {
+                'post_id': f'post_{i}',
+                'description': f'Post {i}',
+                'create_time': 1000 + i,
+                'transcript': f'hola numero {i}',
+                'language': 'spa-ES'
+            }
+            for i in range(4)
+        ]
+    }
+    path = temp_output_dir / "test_user_transcripts.json"
+    with open(path, 'w') as f:
+        json.dump(data, f)
+    return path
+
+
+class TestNormalizeLanguageCode:
+    """Tests for language code normalization."""
+    
+    def test_normalize_three_letter(self):
+        """Test 3-letter codes map to 2-letter codes."""
+        assert normalize_language_code('eng') == 'en'
+        assert normalize_language_code('spa') == 'es'
+    
+    def test_normalize_region_and_case(self):
+        """Test region suffixes and case are stripped."""
+        assert normalize_language_code('EN-us') == 'en'
+        assert normalize_language_code(' fr ') == 'fr'
+
+
+class TestCheckTikTokSubtitles:
+    """Tests for native subtitle lookup."""
+    
+    def test_check_tiktok_subtitles_found(self, sample_post):
+        """Test that a subtitle in the target language is found."""
+        result = check_tiktok_subtitles(sample_post, 'en')
+        
+        assert result is not None
+        assert result['LanguageCodeName'] == 'eng-US'
+    
+    def test_check_tiktok_subtitles_missing(self, sample_post):
+        """Test that other languages return None."""
+        assert check_tiktok_subtitles(sample_post, 'fr') is None
+        assert check_tiktok_subtitles({'video': {}}, 'en') is None
+
+
+def make_aws_service(translate_text):
+    """AWSTranslateService with a stub client, skipping the boto3 setup."""
+    service = AWSTranslateService.__new__(AWSTranslateService)
+    service.client = Mock()
+    service.client.translate_text.side_effect = lambda Text, **kwargs: {
+        'TranslatedText': translate_text(Text)
+    }
+    return service
+
+
+class TestAWSTranslateBatch:
+    """Tests for packing several texts into one AWS request."""
+    
+    def test_translate_batch_single_call(self):
+        """Test that a batch is sent as one request and split back apart."""
+        service = make_aws_service(lambda text: text.upper())
+        
+        result = service.translate_batch(['uno', 'dos', 'tres'], 'es', 'en')
+        
+        assert result == ['UNO', 'DOS', 'TRES']
+        assert service.client.translate_text.call_count == 1
+    
+    def test_translate_batch_separator_lost(self):
+        """Test that a batch whose markers were mangled raises instead of re-sending."""
+        service = make_aws_service(lambda text: re.sub(r'\[\[\d+\]\]', '', text).upper())
+        
+        with pytest.raises(BatchSplitError):
+            service.translate_batch(['uno', 'dos'], 'es', 'en')
+        
+        assert service.client.translate_text.call_count == 1
+    
+    @patch('tiktools.translation.AWSTranslateService')
+    def test_translate_transcripts_reports_resent_batch(self, mock_service_class, transcripts_file):
+        """Test that re-sending a failed batch is counted and makes one call per text."""
+        service = make_aws_service(lambda text: re.sub(r'\[\[\d+\]\]', '', text).upper())
+        mock_service_class.return_value = service
+        
+        results = translate_transcripts(transcripts_file, target_languages=['en'])
+        
+        assert service.client.translate_text.call_count == 1 + 4
+        assert results['service_translated'] == 4
+        assert results['retried_characters'] == sum(len(f'hola numero {i}') for i in range(4))
+        assert results['translations'][0]['translated_text'] == 'HOLA NUMERO 0'
+    
+    def test_translate_splits_oversized_text(self):
+        """Test that text over the request limit is sent in sentence-aligned chunks."""
+        service = make_aws_service(lambda text: text.upper())
+        text = ' '.join(['Una frase bastante larga.'] * 1000)
+        
+        result = service.translate(text, 'es', 'en')
+        
+        assert result == text.upper()
+        assert service.client.translate_text.call_count > 1
+        for call in service.client.translate_text.call_args_list:
+            assert len(call.kwargs['Text'].encode('utf-8')) <= 9000
+    
+    def test_split_for_translate_long_sentence(self):
+        """Test that sentences and words over the limit are still split to size."""
+        chunks = _split_for_translate('palabra ' * 10 + 'x' * 50, max_bytes=20)
+        
+        assert all(len(chunk.encode('utf-8')) <= 20 for chunk in chunks)
+        assert ''.join(chunks).replace(' ', '') == 'palabra' * 10 + 'x' * 50
+
+
+class TestTranslateTranscripts:
+    """Tests for translate_transcripts function."""
+    
+    @patch('tiktools.translation.AWSTranslateService')
+    def test_translate_transcripts_basic(self, mock_service_class, transcripts_file):
+        """Test that every transcript is translated and saved in order."""
+        service = FakeTranslationService()
+        mock_service_class.return_value = service
+        
+        results = translate_transcripts(transcripts_file, target_languages=['en'], max_workers=3)
+        
+        assert results['translations_created'] == 4
+        assert results['failed'] == 0
+        assert [t['post_id'] for t in results['translations']] == [f'post_{i}' for i in range(4)]
+        assert results['translations'][0]['translated_text'] == '[en] hola numero 0'
+        assert len(service.calls) == 4
+        
+        output_dir = transcripts_file.parent
+        assert (output_dir / "post_0.en.txt").exists()
+        with open(output_dir / "test_user_translations.json", 'r') as f:
+            saved_data = json.load(f)
+        assert saved_data['summary']['translations_created'] == 4
+        assert not (output_dir / "test_user_translations.partial.jsonl").exists()
+    
+    @patch('tiktools.translation.AWSTranslateService')
+    def test_translate_transcripts_skips_source_language(self, mock_service_class, transcripts_file):
+        """Test that the source language is never sent to the service."""
+        service = FakeTranslationService()
+        mock_service_class.return_value = service
+        
+        results = translate_transcripts(transcripts_file, target_languages=['es', 'fr'])
+        
+        assert results['translations_created'] == 4
+        assert {call[2] for call in service.calls} == {'fr'}
+    
+    @patch('tiktools.translation.AWSTranslateService')
+    def test_translate_transcripts_failure(self, mock_service_class, transcripts_file):
+        """Test that a failed call is counted without stopping the run."""
+        service = FakeTranslationService(fail_on={'hola numero 2'})
+        mock_service_class.return_value = service
+        
+        results = translate_transcripts(transcripts_file, target_languages=['en'])
+        
+        assert results['translations_created'] == 3
+        assert results['failed'] == 1
+        assert 'post_2' not in [t['post_id'] for t in results['translations']]
+    
+    @patch('tiktools.translation.AWSTranslateService')
+    def test_translate_transcripts_write_failure(self, mock_service_class, transcripts_file):
+        """Test that a translation file that can't be written is counted as failed."""
+        mock_service_class.return_value = FakeTranslationService()
+        # A directory where the file should go makes the write fail
+        (transcripts_file.parent / "post_1.en.txt").mkdir()
+        
+        results = translate_transcripts(transcripts_file, target_languages=['en'])
+        
+        assert results['failed'] == 1
+        assert results['translations_created'] == 3
+        assert results['service_translated'] == 3
+        assert 'post_1' not in [t['post_id'] for t in results['translations']]
+    
+    @patch('tiktools.translation.AWSTranslateService')
+    def test_translate_transcripts_journals_progress(self, mock_service_class, transcripts_file):
+        """Test that finished translations are on disk before the summary JSON is written."""
+        mock_service_class.return_value = FakeTranslationService()
+        
+        with patch('tiktools.translation.write_json', side_effect=KeyboardInterrupt):
+            with pytest.raises(KeyboardInterrupt):
+                translate_transcripts(transcripts_file, target_languages=['en'])
+        
+        journal_path = transcripts_file.parent / "test_user_translations.partial.jsonl"
+        journaled = [json.loads(line) for line in journal_path.read_text().splitlines()]
+        assert [t['post_id'] for t in journaled] == [f'post_{i}' for i in range(4)]
+        
+        # An update run picks up the journaled translations instead of redoing them
+        service = FakeTranslationService()
+        mock_service_class.return_value = service
+        results = translate_transcripts(transcripts_file, target_languages=['en'], update_mode=True)
+        
+        assert service.calls == []
+        assert results['skipped_existing'] == 4
+        assert not journal_path.exists()
+    
+    @patch('tiktools.translation.AWSTranslateService')
+    def test_translate_transcripts_update_mode(self, mock_service_class, transcripts_file):
+        """Test that update mode keeps existing translations without new calls."""
+        service = FakeTranslationService()
+        mock_service_class.return_value = service
+        translate_transcripts(transcripts_file, target_languages=['en'])
+        
+        service = FakeTranslationService()
+        mock_service_class.return_value = service
+        results = translate_transcripts(transcripts_file, target_languages=['en'], update_mode=True)
+        
+        assert results['skipped_existing'] == 4
+        assert len(results['translations']) == 4
+        assert service.calls == []
+    
+    @patch('tiktools.translation._download_transcript')
+    @patch('tiktools.translation.AWSTranslateService')
+    def test_translate_transcripts_native_subtitles(self, mock_service_class, mock_download, transcripts_file):
+        """Test that TikTok's own subtitles replace service calls and the estimate."""
+        service = FakeTranslationService()
+        mock_service_class.return_value = service
+        mock_download.side_effect = lambda url: None if 'post_1' in url else f'native {url}'
+        
+        posts = [
+            {'id': f'post_{i}', 'video': {'subtitleInfos': [
+                {'LanguageCodeName': 'eng-US', 'Source': 'MT', 'Url': f'https://example.com/post_{i}.vtt'}
+            ]}}
+            for i in range(2)
+        ]
+        with open(transcripts_file.parent.parent / "test_user_posts.json", 'w') as f:
+            json.dump({'posts': posts}, f)
+        
+        results = translate_transcripts(transcripts_file, target_languages=['en'])
+        
+        assert results['tiktok_subtitles_used'] == 1
+        assert results['service_translated'] == 3
+        # post_1's subtitle couldn't be downloaded, so its translation is added to the estimate
+        assert results['total_characters'] == sum(len(f'hola numero {i}') for i in (1, 2, 3))
+        assert {call[0] for call in service.calls} == {'hola numero 1', 'hola numero 2', 'hola numero 3'}
+        
+        native = [t for t in results['translations'] if t['is_native_subtitle']]
+        assert native[0]['translated_text'] == 'native https://example.com/post_0.vtt'
+        assert native[0]['translation_service'] == 'tiktok'
+        
+        # Native and service results are saved in transcript order
+        assert [t['post_id'] for t in results['translations']] == [f'post_{i}' for i in range(4)]
+    
+    @patch('tiktools.translation._download_transcript', return_value=None)
+    @patch('tiktools.translation.AWSTranslateService')
+    def test_translate_transcripts_native_fallback_cached(self, mock_service_class, mock_download,
+                                                          transcripts_file, tmp_path):
+        """Test that a subtitle that can't be used falls back to the translation cache."""
+        service = FakeTranslationService()
+        mock_service_class.return_value = service
+        cache = DiskCache(root=tmp_path / "cache")
+        cache.set('translation', {'source': 'es', 'target': 'en', 'text': 'hola numero 0'}, 'cached 0')
+        
+        posts = [{'id': 'post_0', 'video': {'subtitleInfos': [
+            {'LanguageCodeName': 'eng-US', 'Source': 'MT', 'Url': 'https://example.com/post_0.vtt'}
+        ]}}]
+        with open(transcripts_file.parent.parent / "test_user_posts.json", 'w') as f:
+            json.dump({'posts': posts}, f)
+        
+        results = translate_transcripts(transcripts_file, target_languages=['en'], cache=cache)
+        
+        assert results['cached_translations'] == 1
+        assert 'hola numero 0' not in {call[0] for call in service.calls}
+        assert results['total_characters'] == sum(len(f'hola numero {i}') for i in (1, 2, 3))
+    
+    @patch('tiktools.translation.AWSTranslateService')
+    def test_translate_transcripts_batches_requests(self, mock_service_class, transcripts_file):
+        """Test that short transcripts go to the service as one batch."""
+        service = FakeTranslationService()
+        service.translate_batch = Mock(side_effect=lambda texts, src, tgt: [t.upper() for t in texts])
+        mock_service_class.return_value = service
+        
+        results = translate_transcripts(transcripts_file, target_languages=['en', 'fr'])
+        
+        assert results['translations_created'] == 8
+        assert [(t['post_id'], t['target_language']) for t in results['translations']] == [
+            (f'post_{i}', lang) for i in range(4) for lang in ('en', 'fr')
+        ]
+        assert service.translate_batch.call_count == 2
+        assert results['translations'][0]['translated_text'] == 'HOLA NUMERO 0'
+    
+    @patch('tiktools.translation.AWSTranslateService')
+    def test_translate_transcripts_cached(self, mock_service_class, transcripts_file, tmp_path):
+        """Test that cached translations are reused instead of calling the service again."""
+        cache = DiskCache(root=tmp_path / "cache")
+        mock_service_class.return_value = FakeTranslationService()
+        translate_transcripts(transcripts_file, target_languages=['en'], cache=cache)
+        
+        # Translations outlive the cache's default one-day ttl
+        service = FakeTranslationService()
+        mock_service_class.return_value = service
+        with patch('tiktools.cache.time.time', return_value=time.time() + 2 * 86400):
+            results = translate_transcripts(transcripts_file, target_languages=['en'], cache=cache)
+        
+        assert service.calls == []
+        assert results['cached_translations'] == 4
+        assert results['total_characters'] == 0
+        assert results['translations'][0]['translated_text'] == '[en] hola numero 0'
+    
+    @patch('tiktools.translation.AWSTranslateService')
+    def test_translate_transcripts_deduplicates_text(self, mock_service_class, transcripts_file):
+        """Test that identical transcripts are translated once and saved for every post."""
+        data = json.loads(transcripts_file.read_text())
+        for transcript in data['transcripts']:
+            transcript['transcript'] = 'hola a todos'
+        transcripts_file.write_text(json.dumps(data))
+        service = FakeTranslationService()
+        mock_service_class.return_value = service
+        
+        results = translate_transcripts(transcripts_file, target_languages=['en'])
+        
+        assert service.calls == [('hola a todos', 'es', 'en')]
+        assert results['service_translated'] == 4
+        assert {t['post_id'] for t in results['translations']} == {f'post_{i}' for i in range(4)}
+    
+    def test_translate_transcripts_estimate_only(self, transcripts_file):
+        """Test that estimates need no service client and bill duplicate text once."""
+        data = json.loads(transcripts_file.read_text())
+        data['transcripts'][1]['transcript'] = data['transcripts'][0]['transcript']
+        transcripts_file.write_text(json.dumps(data))
+        
+        results = translate_transcripts(transcripts_file, target_languages=['en', 'es'], estimate_only=True)
+        
+        assert results['total_characters'] == 3 * len('hola numero 0')
+        assert results['estimated_cost'] == AWSTranslateService.estimate_cost(results['total_characters'])
+        assert results['estimated_cost'] > 0
+    
+    @patch('tiktools.translation.AWSTranslateService')
+    def test_translate_transcripts_half_cached(self, mock_service_class, transcripts_file, tmp_path):
+        """Test that cache hits and service calls are counted separately."""
+        cache = DiskCache(root=tmp_path / "cache")
+        for i in range(2):
+            cache.set('translation', {'source': 'es', 'target': 'en', 'text': f'hola numero {i}'}, f'cached {i}')
+        service = FakeTranslationService()
+        mock_service_class.return_value = service
+        
+        results = translate_transcripts(transcripts_file, target_languages=['en'], cache=cache)
+        
+        assert results['translations_created'] == 4
+        assert results['cached_translations'] == 2
+        assert results['service_translated'] == 2
+        assert len(service.calls) == 2
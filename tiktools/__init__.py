@@ -16,6 +16,7 @@ __author__ = "Matt Stiles"
 __license__ = "MIT"
 
 from .api import TikAPIClient
+from .cache import DiskCache
 from .posts import fetch_user_posts
 from .transcripts import extract_transcripts, get_best_subtitle
 from .thumbnails import download_thumbnails
@@ -23,6 +24,7 @@ from .translation import translate_transcripts
 
 __all__ = [
     "TikAPIClient",
+    "DiskCache",
     "fetch_user_posts",
     "extract_transcripts",
     "get_best_subtitle",
@@ -0,0 +1,39 @@
+"""
+Helpers for writing output files without needless rewrites.
+"""
+
+from pathlib import Path
+
+
+def write_if_changed(path: Path, data: bytes) -> bool:
+    """
+    Write data to a file unless it already holds exactly that content.
+    
+    Re-runs that produce the same output leave files (and their mtimes)
+    untouched, which keeps file watchers and sync tools quiet.
+    
+    Args:
+        path: Output file path
+        data: File content
+        
+    Returns:
+        True if the file was written, False if it was already up to date
+    """
+    if is_unchanged(path, data):
+        return False
+    
+    path.write_bytes(data)
+    return True
+
+
+def write_text_if_changed(path: Path, text: str) -> bool:
+    """Write UTF-8 text to a file unless it already holds exactly that content."""
+    return write_if_changed(path, text.encode('utf-8'))
+
+
+def is_unchanged(path: Path, data: bytes) -> bool:
+    """Check whether a file already holds exactly data (comparing sizes first)."""
+    try:
+        return path.stat().st_size == len(data) and path.read_bytes() == data
+    except OSError:
+        return False
@@ -0,0 +1,64 @@
+"""
+Shared HTTP session setup for file downloads.
+"""
+
+import atexit
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+def create_session(pool_maxsize: int = 32, headers: Optional[Dict[str, str]] = None) -> requests.Session:
+    """
+    Create a requests session with connection pooling and retries.
+    
+    Reusing one session keeps connections to the TikTok CDN alive between
+    downloads instead of paying a TCP + TLS handshake for every file.
+    
+    Args:
+        pool_maxsize: Connections kept per host (should cover the worker count)
+        headers: Default headers sent with every request
+        
+    Returns:
+        Configured session
+    """
+    session = requests.Session()
+    _mount_adapter(session, pool_maxsize)
+    
+    if headers:
+        session.headers.update(headers)
+    
+    # Close pooled connections cleanly when the interpreter exits
+    atexit.register(session.close)
+    
+    return session
+
+
+def ensure_pool_size(session: requests.Session, pool_maxsize: int) -> None:
+    """
+    Grow a session's per-host connection pool to cover pool_maxsize workers.
+    
+    With more workers than pooled connections, urllib3 discards the extra
+    connections after each request ("Connection pool is full") and the
+    reuse is lost. Call this before starting the workers.
+    
+    Args:
+        session: Session from create_session
+        pool_maxsize: Number of threads that will share the session
+    """
+    adapter = session.get_adapter('https://')
+    if getattr(adapter, '_pool_maxsize', 0) >= pool_maxsize:
+        return
+    
+    _mount_adapter(session, pool_maxsize)
+    adapter.close()
+
+
+def _mount_adapter(session: requests.Session, pool_maxsize: int) -> None:
+    """Mount a pooled, retrying adapter for http and https on a session."""
+    retries = Retry(total=5, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504])
+    adapter = HTTPAdapter(pool_connections=8, pool_maxsize=pool_maxsize, max_retries=retries)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
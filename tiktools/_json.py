@@ -0,0 +1,217 @@
+"""
+JSON helpers that use orjson when it is installed and fall back to the stdlib.
+"""
+
+import gzip
+import json
+import math
+import os
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ._files import is_unchanged
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# First bytes of every gzip file
+_GZIP_MAGIC = b'\x1f\x8b'
+
+
+def _open_binary(path: Path):
+    """Open a file for binary reading, decompressing it if it is gzip'd."""
+    f = open(path, 'rb')
+    if f.read(2) == _GZIP_MAGIC:
+        f.close()
+        return gzip.open(path, 'rb')
+    f.seek(0)
+    return f
+
+
+def _has_non_finite(obj: Any) -> bool:
+    """Return True if obj contains a NaN or infinite float anywhere."""
+    stack = [obj]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, float):
+            if not math.isfinite(item):
+                return True
+        elif isinstance(item, dict):
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple)):
+            stack.extend(item)
+    return False
+
+
+def dumps(obj: Any) -> bytes:
+    """
+    Serialize an object to indented UTF-8 JSON.
+    
+    Output has the same layout and values as json.dumps(obj, indent=2,
+    ensure_ascii=False). With orjson, floats in exponent form are spelled
+    differently (1e20 rather than 1e+20) but read back the same. NaN and
+    Infinity, which orjson would write as null, go through the stdlib so
+    they are kept.
+    
+    Args:
+        obj: JSON-serializable object
+        
+    Returns:
+        Encoded JSON document
+    """
+    if orjson is not None and not _has_non_finite(obj):
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+        except TypeError:
+            # orjson rejects a few things json accepts (e.g. ints over 64 bits)
+            pass
+    
+    return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+
+
+def write_json(path: Path, obj: Any) -> None:
+    """
+    Write an object to a JSON file atomically.
+    
+    The data goes to a temporary file next to path, which then replaces it,
+    so a crash mid-write leaves the previous file intact. Paths ending in
+    .gz are gzip-compressed. An existing file with identical content is not rewritten.
+    
+    Args:
+        path: Output file path
+        obj: JSON-serializable object
+    """
+    path = Path(path)
+    data = dumps(obj)
+    if path.suffix == '.gz':
+        data = gzip.compress(data, compresslevel=6, mtime=0)
+    
+    # Leave the file (and its mtime) alone if nothing changed
+    if is_unchanged(path, data):
+        return
+    
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        # Don't leave a half-written temp file behind
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def load_json(path: Path) -> Any:
+    """
+    Read a JSON file, which may be gzip-compressed.
+    
+    Args:
+        path: JSON file path
+        
+    Returns:
+        Decoded JSON document
+    """
+    with _open_binary(path) as f:
+        raw = f.read()
+    
+    if orjson is not None:
+        try:
+            return orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            # orjson rejects a few things json accepts (e.g. NaN)
+            pass
+    
+    return json.loads(raw)
+
+
+def dumps_line(obj: Any) -> bytes:
+    """Serialize an object as one compact line of JSON Lines."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_APPEND_NEWLINE)
+        except TypeError:
+            pass
+    
+    return (json.dumps(obj, ensure_ascii=False, separators=(',', ':')) + '\n').encode('utf-8')
+
+
+def read_jsonl(path: Path) -> List:
+    """
+    Read a JSON Lines file.
+    
+    A truncated last line (from a run that was killed mid-write) is ignored.
+    
+    Args:
+        path: JSON Lines file path
+        
+    Returns:
+        List of decoded records
+    """
+    records = []
+    with open(path, 'rb') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                break
+    return records
+
+
+def _read_header(f, stop_key: str) -> Dict:
+    """Collect top-level scalar fields that appear before stop_key."""
+    header = {}
+    current = None
+    
+    for prefix, event, value in ijson.parse(f, use_float=True):
+        if prefix == '' and event == 'map_key':
+            if value == stop_key:
+                break
+            current = value
+        elif prefix == current and event in ('string', 'number', 'boolean', 'null'):
+            header[current] = value
+    
+    return header
+
+
+def load_records(
+    path: Path,
+    key: str,
+    transform: Optional[Callable[[Dict], Any]] = None
+) -> Tuple[Dict, List]:
+    """
+    Load the record list stored under a top-level key, plus the scalar fields before it.
+    
+    With ijson installed the records are streamed one at a time and passed
+    through transform, so only the transformed records are kept in memory.
+    gzip-compressed files are detected and decompressed on the fly.
+    
+    Args:
+        path: JSON file path
+        key: Top-level key holding the list of records (e.g. 'posts')
+        transform: Optional function applied to each record as it is read
+        
+    Returns:
+        Tuple of (top-level scalar fields, list of records)
+    """
+    if ijson is None:
+        with _open_binary(path) as f:
+            data = json.load(f)
+        records = data.get(key, [])
+        header = {k: v for k, v in data.items() if not isinstance(v, (dict, list))}
+        return header, [transform(r) for r in records] if transform else records
+    
+    with _open_binary(path) as f:
+        header = _read_header(f, key)
+        f.seek(0)
+        records = ijson.items(f, f'{key}.item', use_float=True)
+        return header, [transform(r) for r in records] if transform else list(records)
@@ -3,9 +3,89 @@ TikAPI client wrapper with convenience methods.
 """
 
 import os
-from typing import Optional
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
 from tikapi import TikAPI, ValidationException, ResponseException
 
+from .cache import DiskCache
+
+# Profiles change (follower/video counts), so cache them for less time than other responses
+PROFILE_CACHE_TTL = 3600
+
+# How many times a rate-limited (HTTP 429) request is retried, and the longest single wait
+RATE_LIMIT_RETRIES = 5
+MAX_RATE_LIMIT_WAIT = 60
+
+
+def _header_number(response, name: str) -> Optional[float]:
+    """Read a numeric response header, or None if absent."""
+    try:
+        return float(response.headers.get(name))
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+def _header_seconds(response, name: str) -> Optional[float]:
+    """Read a rate-limit header as seconds from now, or None if absent."""
+    value = _header_number(response, name)
+    if value is None:
+        return None
+    
+    # Reset headers may be a Unix timestamp rather than a delay
+    if value > 1_000_000_000:
+        value -= time.time()
+    
+    return min(max(value, 0.0), MAX_RATE_LIMIT_WAIT)
+
+
+def _wait(delay: float, cancel: Optional[threading.Event]) -> None:
+    """Sleep for delay seconds, returning early (with an error) if cancel is set."""
+    if cancel is None:
+        time.sleep(delay)
+    elif cancel.wait(delay):
+        raise InterruptedError("Cancelled while waiting for the TikAPI rate limit")
+
+
+def _call_with_backoff(call, *args, cancel: Optional[threading.Event] = None, **kwargs):
+    """
+    Call a TikAPI method, retrying with backoff when it is rate limited.
+    
+    Waits as long as the Retry-After / X-RateLimit-Reset headers ask, or
+    backs off exponentially with jitter if the response doesn't say. Setting
+    cancel ends a wait early, so a background fetch can't outlive its caller.
+    """
+    for attempt in range(RATE_LIMIT_RETRIES + 1):
+        try:
+            return call(*args, **kwargs)
+        except ResponseException as e:
+            response = getattr(e, 'response', None)
+            if getattr(response, 'status_code', None) != 429 or attempt == RATE_LIMIT_RETRIES:
+                raise
+            
+            delay = _header_seconds(response, 'Retry-After')
+            if delay is None:
+                delay = _header_seconds(response, 'X-RateLimit-Reset')
+            if delay is None:
+                delay = 2 ** attempt + random.uniform(0, 0.5)
+            
+            print(f"Rate limited by TikAPI, retrying in {delay:.1f}s...")
+            _wait(delay, cancel)
+
+
+def _next_page(response, cancel: Optional[threading.Event] = None):
+    """Fetch the page after response, waiting first if the quota is used up."""
+    remaining = _header_number(response, 'X-RateLimit-Remaining')
+    if remaining is not None and remaining < 1:
+        delay = _header_seconds(response, 'X-RateLimit-Reset')
+        if delay:
+            print(f"TikAPI quota exhausted, waiting {delay:.1f}s for reset...")
+            _wait(delay, cancel)
+    
+    return _call_with_backoff(response.next_items, cancel=cancel)
+
 
 class TikAPIClient:
     """
@@ -17,13 +97,19 @@ class TikAPIClient:
         >>> posts = client.get_posts(profile['secUid'])
     """
     
-    def __init__(self, api_key: Optional[str] = None, sandbox: bool = False):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        sandbox: bool = False,
+        cache: Optional[DiskCache] = None
+    ):
         """
         Initialize TikAPI client.
         
         Args:
             api_key: TikAPI key (defaults to TIKAPI_KEY environment variable)
             sandbox: Whether to use sandbox server for testing
+            cache: Optional on-disk cache for profile lookups
         """
         self.api_key = api_key or os.getenv('TIKAPI_KEY')
         
@@ -34,6 +120,8 @@ class TikAPIClient:
             )
         
         self.api = TikAPI(self.api_key)
+        self.sandbox = sandbox
+        self.cache = cache
         
         if sandbox:
             self.api.set(__sandbox__=True)
@@ -53,8 +141,14 @@ class TikAPIClient:
             ValidationException: If API validation fails
             ResponseException: If API request fails
         """
+        cache_params = {'username': username, 'sandbox': self.sandbox}
+        if self.cache is not None:
+            cached = self.cache.get('profile', cache_params, ttl=PROFILE_CACHE_TTL)
+            if cached is not None:
+                return cached
+        
         try:
-            response = self.api.public.check(username=username)
+            response = _call_with_backoff(self.api.public.check, username=username)
             data = response.json()
             
             if not data or 'userInfo' not in data:
@@ -62,7 +156,7 @@ class TikAPIClient:
             
             user_info = data['userInfo']
             
-            return {
+            profile = {
                 'username': username,
                 'secUid': user_info['user']['secUid'],
                 'nickname': user_info['user']['nickname'],
@@ -71,34 +165,85 @@ class TikAPIClient:
                 'raw': user_info  # Full data
             }
             
+            if self.cache is not None:
+                self.cache.set('profile', cache_params, profile)
+            
+            return profile
+            
         except (ValidationException, ResponseException) as e:
             raise
     
-    def get_posts(self, sec_uid: str, max_count: Optional[int] = None):
+    def get_posts(
+        self,
+        sec_uid: str,
+        max_count: Optional[int] = None,
+        prefetch: bool = True,
+        cursor: Optional[str] = None,
+        on_page: Optional[Callable[[Optional[str]], None]] = None
+    ):
         """
         Get posts for a user by their secUid.
         
+        While the caller works through one page, the next page is requested
+        in the background so the API round-trip overlaps with processing.
+        Rate-limited requests are retried after the wait TikAPI asks for.
+        
         Args:
             sec_uid: User's secUid (get from get_profile)
             max_count: Maximum number of posts to retrieve
+            prefetch: Request the next page before the current one is consumed.
+                Disable when the caller is likely to stop early (e.g. update mode),
+                since a prefetched page is billed even if it is never read.
+            cursor: Pagination cursor to start from (resumes an earlier listing)
+            on_page: Called after each page's posts have been yielded, with the
+                cursor for the following page (None after the last page)
             
         Yields:
             Post dictionaries from TikAPI
         """
-        response = self.api.public.posts(secUid=sec_uid)
+        response = _call_with_backoff(self.api.public.posts, secUid=sec_uid, cursor=cursor)
         count = 0
+        executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+        next_page = None
+        # Set when the caller stops early, so a prefetch sleeping on a rate limit doesn't keep the process alive
+        cancel = threading.Event()
         
-        while response:
-            data = response.json()
-            
-            if 'itemList' in data:
-                for item in data['itemList']:
+        try:
+            while response:
+                data = response.json()
+                items = data.get('itemList', [])
+                has_more = data.get('hasMore') or data.get('has_more')
+                
+                # Start fetching the next page unless this one already fills max_count
+                next_page = None
+                if executor and has_more and not (max_count and count + len(items) >= max_count):
+                    next_page = executor.submit(_next_page, response, cancel)
+                
+                for item in items:
                     yield item
                     count += 1
                     
                     if max_count and count >= max_count:
                         return
-            
-            # Get next page
-            response = response.next_items()
-
+                
+                if on_page is not None:
+                    # Same cursor lookup tikapi's next_items uses
+                    next_cursor = data.get('offset', data.get('cursor', data.get('nextCursor')))
+                    if not has_more:
+                        on_page(None)
+                    elif next_cursor is not None:
+                        on_page(str(next_cursor))
+                
+                # Get next page
+                if next_page is not None:
+                    response = next_page.result()
+                elif has_more:
+                    response = _next_page(response)
+                else:
+                    response = None
+        finally:
+            cancel.set()
+            if next_page is not None:
+                next_page.cancel()
+            if executor:
+                executor.shutdown(wait=False)
@@ -0,0 +1,139 @@
+"""
+Simple on-disk cache for API responses and downloaded files.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+# Pass as get()'s ttl for entries that should never expire, whatever the cache's default
+NO_EXPIRY = float('inf')
+
+
+def default_cache_dir() -> Path:
+    """Return the default cache directory (~/.cache/tiktools or $XDG_CACHE_HOME/tiktools)."""
+    base = os.getenv('XDG_CACHE_HOME') or Path.home() / '.cache'
+    return Path(base) / 'tiktools'
+
+
+class DiskCache:
+    """
+    Cache JSON-serializable values on disk, keyed by endpoint and parameters.
+    
+    Each entry is a gzip'd JSON file named after a SHA-256 of the request,
+    so repeated runs can skip API calls and downloads they've already made.
+    
+    Example:
+        >>> cache = DiskCache()
+        >>> cache.set('profile', {'username': 'davis_big_dawg'}, profile)
+        >>> cache.get('profile', {'username': 'davis_big_dawg'})
+    """
+    
+    def __init__(self, root: Optional[Path] = None, ttl: Optional[float] = 86400, refresh: bool = False):
+        """
+        Initialize the cache.
+        
+        Args:
+            root: Cache directory (defaults to ~/.cache/tiktools)
+            ttl: Default entry lifetime in seconds (None to never expire)
+            refresh: Ignore existing entries on read, but still store new ones
+        """
+        self.root = Path(root) if root else default_cache_dir()
+        self.ttl = ttl
+        self.refresh = refresh
+    
+    def _path(self, endpoint: str, params: Dict) -> Path:
+        """Return the file path for an endpoint/params pair."""
+        key = json.dumps([endpoint, params], sort_keys=True, ensure_ascii=False)
+        digest = hashlib.sha256(key.encode('utf-8')).hexdigest()
+        return self.root / digest[:2] / f"{digest}.json.gz"
+    
+    def get(self, endpoint: str, params: Dict, ttl: Optional[float] = None) -> Optional[Any]:
+        """
+        Look up a cached value.
+        
+        Args:
+            endpoint: Name of the request type (e.g. 'profile', 'subtitle')
+            params: Request parameters
+            ttl: Maximum age in seconds (defaults to the cache's ttl; NO_EXPIRY to accept any age)
+        
+        Returns:
+            Cached value, or None if missing, expired or refresh is set
+        """
+        entry = self._read(endpoint, params)
+        if entry is None:
+            return None
+        
+        max_age = self.ttl if ttl is None else ttl
+        if max_age is not None and time.time() - entry.get('stored_at', 0) > max_age:
+            return None
+        
+        return entry.get('value')
+    
+    def get_stale(self, endpoint: str, params: Dict) -> Optional[Tuple[Any, Dict]]:
+        """
+        Look up a cached value regardless of its age.
+        
+        Used to revalidate expired entries with a conditional request.
+        
+        Args:
+            endpoint: Name of the request type (e.g. 'profile', 'subtitle')
+            params: Request parameters
+        
+        Returns:
+            (value, meta) tuple, or None if missing or refresh is set
+        """
+        entry = self._read(endpoint, params)
+        if entry is None:
+            return None
+        return entry.get('value'), entry.get('meta') or {}
+    
+    def _read(self, endpoint: str, params: Dict) -> Optional[Dict]:
+        """Load the raw entry for a request, or None if missing, unreadable or refresh is set."""
+        if self.refresh:
+            return None
+        
+        path = self._path(endpoint, params)
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+    
+    def set(self, endpoint: str, params: Dict, value: Any, meta: Optional[Dict] = None) -> None:
+        """
+        Store a value in the cache.
+        
+        Best-effort: if the entry can't be written (read-only or full disk,
+        permissions), a warning is printed and the caller carries on uncached.
+        
+        Args:
+            endpoint: Name of the request type (e.g. 'profile', 'subtitle')
+            params: Request parameters
+            value: JSON-serializable value to store
+            meta: Optional extra data kept with the entry (e.g. HTTP validators)
+        """
+        path = self._path(endpoint, params)
+        
+        # Write to a private temp file and rename so concurrent readers never see a partial entry
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        entry = {'stored_at': time.time(), 'value': value}
+        if meta:
+            entry['meta'] = meta
+        
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            try:
+                tmp_path.unlink(missing_ok=True)
+            except OSError:
+                pass
+            print(f"  Warning: Could not write {endpoint} cache entry: {e}")
@@ -2,12 +2,90 @@
 Functions for fetching and managing TikTok post metadata.
 """
 
-import json
+import os
 from pathlib import Path
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, Tuple
 from tikapi import ValidationException, ResponseException
 
+from ._json import dumps_line, load_json, load_records, read_jsonl, write_json
 from .api import TikAPIClient
+from .cache import DiskCache
+
+# How many of the newest post ids the update cursor remembers
+CURSOR_RECENT_IDS = 200
+
+
+def _sidecar_path(output_file: Path, suffix: str) -> Path:
+    """Return a helper file next to a posts file, e.g. user_posts.cursor.json."""
+    name = output_file.name[:-3] if output_file.name.endswith('.gz') else output_file.name
+    return output_file.with_name(f"{Path(name).stem}{suffix}")
+
+
+def _cursor_path(output_file: Path) -> Path:
+    """Return the update cursor file that sits next to a posts file."""
+    return _sidecar_path(output_file, '.cursor.json')
+
+
+def _spool_path(output_file: Path) -> Path:
+    """Return the file that posts are spooled to while a fetch is running."""
+    return _sidecar_path(output_file, '.partial.jsonl')
+
+
+def _read_spool(spool_path: Path) -> Tuple[List[Dict], Optional[str], bool]:
+    """
+    Recover the posts and pagination position saved by an interrupted fetch.
+    
+    The spool holds posts interleaved with {'_cursor': ...} markers written
+    after each complete page. Posts after the last marker belong to a page
+    that wasn't finished, so they are dropped and fetched again.
+    
+    Returns:
+        Tuple of (posts, cursor to resume from, whether the listing was finished)
+    """
+    try:
+        records = read_jsonl(spool_path)
+    except OSError:
+        return [], None, False
+    
+    last_marker = max((i for i, r in enumerate(records) if '_cursor' in r), default=None)
+    if last_marker is None:
+        return [], None, False
+    
+    posts = [r for r in records[:last_marker] if '_cursor' not in r]
+    cursor = records[last_marker]['_cursor']
+    return posts, cursor, cursor is None
+
+
+def _read_cursor(output_file: Path) -> Optional[Dict]:
+    """
+    Load the update cursor for a posts file.
+    
+    Returns None if there is no cursor or it was written for a different
+    version of the posts file (e.g. the file was edited or replaced since).
+    """
+    try:
+        cursor = load_json(_cursor_path(output_file))
+    except (OSError, ValueError):
+        return None
+    
+    # A hand-edited or old-format sidecar may be valid JSON without being a cursor
+    if not isinstance(cursor, dict):
+        return None
+    
+    if cursor.get('posts_mtime_ns') != output_file.stat().st_mtime_ns:
+        return None
+    
+    return cursor
+
+
+def _write_cursor(output_file: Path, posts: List[Dict]) -> None:
+    """Save the newest post time and ids so update runs don't have to parse the posts file up front."""
+    recent = sorted(posts, key=lambda p: p.get('createTime', 0), reverse=True)[:CURSOR_RECENT_IDS]
+    write_json(_cursor_path(output_file), {
+        'most_recent_time': max((p.get('createTime', 0) for p in posts), default=0),
+        'recent_ids': [p['id'] for p in recent],
+        'posts_mtime_ns': output_file.stat().st_mtime_ns
+    })
 
 
 def fetch_user_posts(
@@ -18,7 +96,8 @@ def fetch_user_posts(
     sandbox: bool = False,
     update_mode: bool = False,
     download_thumbnails: bool = False,
-    thumbnail_type: str = "cover"
+    thumbnail_type: str = "cover",
+    cache: Optional[DiskCache] = None
 ) -> Dict:
     """
     Retrieve all posts for a given TikTok username.
@@ -32,16 +111,17 @@ def fetch_user_posts(
         update_mode: Only fetch new posts since last run
         download_thumbnails: Download thumbnails immediately (recommended, URLs expire)
         thumbnail_type: Type of thumbnail to download if download_thumbnails=True
-        
+        cache: Optional on-disk cache for the profile lookup
+    
     Returns:
         Dictionary containing all posts and metadata
-        
+    
     Example:
         >>> data = fetch_user_posts("davis_big_dawg", download_thumbnails=True)
         >>> print(f"Fetched {len(data['posts'])} posts")
     """
     # Initialize API client
-    client = TikAPIClient(api_key=api_key, sandbox=sandbox)
+    client = TikAPIClient(api_key=api_key, sandbox=sandbox, cache=cache)
     
     print(f"Fetching profile information for @{username}...")
     
@@ -54,63 +134,127 @@ def fetch_user_posts(
         
         # Check for existing posts in update mode
         existing_posts: List[Dict] = []
+        existing_loaded = False
         most_recent_time = 0
         existing_post_ids = set()
         
         if update_mode and output_file and output_file.exists():
-            print(f"\nUpdate mode: Loading existing posts from {output_file}...")
-            try:
-                with open(output_file, 'r', encoding='utf-8') as f:
-                    existing_data = json.load(f)
-                    existing_posts = existing_data.get('posts', [])
+            cursor = _read_cursor(output_file)
+            
+            if cursor is not None:
+                # The cursor is enough to know where to stop; the posts file is read at merge time
+                most_recent_time = cursor.get('most_recent_time', 0)
+                existing_post_ids = set(cursor.get('recent_ids', []))
+                print(f"\nUpdate mode: Most recent post: {most_recent_time}")
+            else:
+                print(f"\nUpdate mode: Loading existing posts from {output_file}...")
+                try:
+                    _, existing_posts = load_records(output_file, 'posts')
+                    existing_loaded = True
                     existing_post_ids = {p['id'] for p in existing_posts}
                     
                     if existing_posts:
                         most_recent_time = max(p.get('createTime', 0) for p in existing_posts)
                         print(f"  Found {len(existing_posts)} existing posts")
                         print(f"  Most recent post: {most_recent_time}")
-            except Exception as e:
-                print(f"  Warning: Could not load existing posts: {e}")
-                print(f"  Proceeding with full fetch...")
-        
-        print(f"Fetching posts...")
+                except Exception as e:
+                    print(f"  Warning: Could not load existing posts: {e}")
+                    print(f"  Proceeding with full fetch...")
         
         # Fetch posts
         all_posts: List[Dict] = []
         new_posts_count = 0
         should_stop = False
+        resume_cursor = None
+        listing_done = False
+        spool = None
+        
+        if output_file:
+            # Posts are spooled to disk as they arrive so an interrupted fetch can resume
+            spool_path = _spool_path(output_file)
+            if spool_path.exists():
+                all_posts, resume_cursor, listing_done = _read_spool(spool_path)
+                if all_posts:
+                    print(f"\nResuming interrupted fetch: {len(all_posts)} posts already retrieved")
+                    if update_mode:
+                        new_posts_count = len(all_posts)
+            
+            spool_path.parent.mkdir(parents=True, exist_ok=True)
+            spool = open(spool_path, 'wb')
+            for post in all_posts:
+                spool.write(dumps_line(post))
+            if all_posts:
+                spool.write(dumps_line({'_cursor': resume_cursor}))
+        
+        def spool_post(post: Dict) -> None:
+            if spool is not None:
+                spool.write(dumps_line(post))
+        
+        def save_page(next_cursor: Optional[str]) -> None:
+            # Mark the end of a complete page; posts before it never need fetching again
+            if spool is not None:
+                spool.write(dumps_line({'_cursor': next_cursor}))
+                spool.flush()
+                os.fsync(spool.fileno())
         
-        for iteration, post in enumerate(client.get_posts(profile['secUid']), 1):
-            # In update mode, stop when we hit posts we already have
-            if update_mode and most_recent_time > 0:
-                item_time = post.get('createTime', 0)
-                item_id = post.get('id')
+        if listing_done or (max_posts and len(all_posts) >= max_posts):
+            posts_iter = iter(())
+        else:
+            print(f"Fetching posts...")
+            # Update runs usually stop within the first page, so don't pay for a prefetched one
+            posts_iter = client.get_posts(
+                profile['secUid'],
+                prefetch=not update_mode,
+                cursor=resume_cursor,
+                on_page=save_page
+            )
+        
+        try:
+            for iteration, post in enumerate(posts_iter, len(all_posts) + 1):
+                # In update mode, stop when we hit posts we already have
+                if update_mode and most_recent_time > 0:
+                    item_time = post.get('createTime', 0)
+                    item_id = post.get('id')
+                    
+                    if item_time <= most_recent_time or item_id in existing_post_ids:
+                        print(f"Iteration {iteration}: Reached existing posts, stopping")
+                        break
+                    
+                    all_posts.append(post)
+                    spool_post(post)
+                    new_posts_count += 1
+                    
+                    if new_posts_count % 10 == 0:
+                        print(f"Iteration {iteration}: Found {new_posts_count} new posts")
+                else:
+                    all_posts.append(post)
+                    spool_post(post)
+                    
+                    if len(all_posts) % 50 == 0:
+                        print(f"Iteration {iteration}: Retrieved {len(all_posts)} posts")
                 
-                if item_time <= most_recent_time or item_id in existing_post_ids:
-                    print(f"Iteration {iteration}: Reached existing posts, stopping")
+                # Check max_posts limit
+                if max_posts and len(all_posts) >= max_posts:
+                    all_posts = all_posts[:max_posts]
+                    print(f"Reached max_posts limit of {max_posts}")
                     break
-                
-                all_posts.append(post)
-                new_posts_count += 1
-                
-                if new_posts_count % 10 == 0:
-                    print(f"Iteration {iteration}: Found {new_posts_count} new posts")
-            else:
-                all_posts.append(post)
-                
-                if len(all_posts) % 50 == 0:
-                    print(f"Iteration {iteration}: Retrieved {len(all_posts)} posts")
-            
-            # Check max_posts limit
-            if max_posts and len(all_posts) >= max_posts:
-                all_posts = all_posts[:max_posts]
-                print(f"Reached max_posts limit of {max_posts}")
-                break
+        finally:
+            if spool is not None:
+                spool.close()
+        
+        # Load existing posts now if the cursor let us skip it earlier. Errors propagate
+        # here, since saving without them would drop every existing post from the file.
+        if update_mode and most_recent_time > 0 and not existing_loaded:
+            _, existing_posts = load_records(output_file, 'posts')
+            print(f"\nLoaded {len(existing_posts)} existing posts from {output_file}")
         
         # Merge with existing posts if in update mode
         if update_mode and existing_posts:
             print(f"\nMerging {len(all_posts)} new posts with {len(existing_posts)} existing posts...")
-            all_posts = all_posts + existing_posts
+            # Key by id so a re-fetched post replaces its stale copy, newest first
+            merged = {p['id']: p for p in existing_posts}
+            merged.update((p['id'], p) for p in all_posts)
+            all_posts = sorted(merged.values(), key=lambda p: p.get('createTime', 0), reverse=True)
             print(f"  Total posts after merge: {len(all_posts)}")
         
         # Prepare output data
@@ -128,8 +272,11 @@ def fetch_user_posts(
         if output_file:
             output_file.parent.mkdir(parents=True, exist_ok=True)
             
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(output_data, f, indent=2, ensure_ascii=False)
+            write_json(output_file, output_data)
+            _write_cursor(output_file, all_posts)
+            
+            # The fetch is complete, so there is nothing left to resume
+            _spool_path(output_file).unlink(missing_ok=True)
             
             if update_mode and new_posts_count > 0:
                 print(f"\nSuccessfully saved {len(all_posts)} total posts ({new_posts_count} new) to {output_file}")
@@ -154,7 +301,7 @@ def fetch_user_posts(
                     print(f"  Warning: Thumbnail download failed: {e}")
         
         return output_data
-        
+    
     except (ValidationException, ResponseException) as e:
         print(f"API error: {e}")
         raise
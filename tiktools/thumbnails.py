@@ -2,10 +2,15 @@
 Functions for downloading TikTok video thumbnails.
 """
 
-import json
+import os
+import re
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional, Dict, List
+from typing import Callable, Optional, Dict, List
+
+from ._http import create_session, ensure_pool_size
+from ._json import dumps_line, load_json, load_records, read_jsonl, write_json
 
 
 THUMBNAIL_TYPES = {
@@ -19,6 +24,61 @@ THUMBNAIL_TYPES = {
 }
 
 
+def _compile_path(path: str) -> Callable[[Dict], Optional[str]]:
+    """Build a function that looks up a dotted path like 'video.zoomCover.240' in a post."""
+    keys = tuple(path.split('.'))
+    
+    def extract(post: Dict) -> Optional[str]:
+        try:
+            value = post
+            for key in keys:
+                value = value[key]
+        except (KeyError, TypeError):
+            return None
+        return value if isinstance(value, str) else None
+    
+    return extract
+
+
+# Paths are split once here rather than on every lookup
+THUMBNAIL_EXTRACTORS = {name: _compile_path(path) for name, path in THUMBNAIL_TYPES.items()}
+
+# Fields under 'video' that THUMBNAIL_TYPES can point at
+_THUMBNAIL_VIDEO_KEYS = {path.split('.')[1] for path in THUMBNAIL_TYPES.values()}
+
+# Image extension at the end of a URL path
+_URL_EXTENSION_RE = re.compile(r'\.(?:jpg|jpeg|png|webp|avif|gif)$')
+
+# Image format named in a content-type header, and the extension to save it with
+_CONTENT_TYPE_RE = re.compile(r'jpe?g|png|webp|avif|gif')
+_CONTENT_TYPE_EXTENSIONS = {
+    'jpeg': '.jpg',
+    'jpg': '.jpg',
+    'png': '.png',
+    'webp': '.webp',
+    'avif': '.avif',
+    'gif': '.gif',
+}
+
+# Headers that mimic a browser request, which the TikTok CDN expects
+BROWSER_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'image/avif,image/webp,image/apng,image/svg+xml,image/*,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.9',
+    'Accept-Encoding': 'gzip, deflate, br',
+    'Referer': 'https://www.tiktok.com/',
+    'Sec-Ch-Ua': '"Not_A Brand";v="8", "Chromium";v="120"',
+    'Sec-Ch-Ua-Mobile': '?0',
+    'Sec-Ch-Ua-Platform': '"macOS"',
+    'Sec-Fetch-Dest': 'image',
+    'Sec-Fetch-Mode': 'no-cors',
+    'Sec-Fetch-Site': 'cross-site',
+}
+
+# Shared by all thumbnail downloads so CDN connections are reused
+_session = create_session(headers=BROWSER_HEADERS)
+
+
 def get_thumbnail_url(post: Dict, thumbnail_type: str = "cover") -> Optional[str]:
     """
     Extract thumbnail URL from post object.
@@ -30,27 +90,21 @@ def get_thumbnail_url(post: Dict, thumbnail_type: str = "cover") -> Optional[str
     Returns:
         Thumbnail URL or None if not found
     """
-    if thumbnail_type not in THUMBNAIL_TYPES:
+    if thumbnail_type not in THUMBNAIL_EXTRACTORS:
         raise ValueError(
             f"Invalid thumbnail_type '{thumbnail_type}'. "
             f"Must be one of: {', '.join(THUMBNAIL_TYPES.keys())}"
         )
     
-    path = THUMBNAIL_TYPES[thumbnail_type]
-    parts = path.split('.')
-    
-    obj = post
-    for part in parts:
-        if not isinstance(obj, dict):
-            return None
-        obj = obj.get(part)
-        if obj is None:
-            return None
-    
-    return obj if isinstance(obj, str) else None
+    return THUMBNAIL_EXTRACTORS[thumbnail_type](post)
 
 
-def download_thumbnail(url: str, output_path: Path, timeout: int = 30) -> bool:
+def download_thumbnail(
+    url: str,
+    output_path: Path,
+    timeout: int = 30,
+    session: Optional[requests.Session] = None
+) -> bool:
     """
     Download thumbnail image from URL.
     
@@ -58,34 +112,19 @@ def download_thumbnail(url: str, output_path: Path, timeout: int = 30) -> bool:
         url: Thumbnail URL
         output_path: Path to save image
         timeout: Request timeout in seconds
+        session: Session to download with (defaults to a shared pooled session)
         
     Returns:
         True if successful, False otherwise
     """
     try:
-        # Use headers to mimic browser request
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'image/avif,image/webp,image/apng,image/svg+xml,image/*,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.9',
-            'Accept-Encoding': 'gzip, deflate, br',
-            'Referer': 'https://www.tiktok.com/',
-            'Sec-Ch-Ua': '"Not_A Brand";v="8", "Chromium";v="120"',
-            'Sec-Ch-Ua-Mobile': '?0',
-            'Sec-Ch-Ua-Platform': '"macOS"',
-            'Sec-Fetch-Dest': 'image',
-            'Sec-Fetch-Mode': 'no-cors',
-            'Sec-Fetch-Site': 'cross-site',
-        }
-        
-        response = requests.get(url, headers=headers, timeout=timeout, stream=True)
+        # Thumbnails are small, so read the whole body at once and free the connection
+        response = (session or _session).get(url, timeout=timeout)
         response.raise_for_status()
         
         # Write image to file
         output_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(output_path, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                f.write(chunk)
+        output_path.write_bytes(response.content)
         
         return True
         
@@ -114,40 +153,41 @@ def detect_image_extension(url: str, response_headers: Optional[Dict] = None) ->
     """
     # Check URL for explicit extension
     url_lower = url.lower().split('?')[0]  # Remove query params
-    for ext in ['.jpg', '.jpeg', '.png', '.webp', '.avif', '.gif']:
-        if url_lower.endswith(ext):
-            return ext
+    match = _URL_EXTENSION_RE.search(url_lower)
+    if match:
+        return match.group(0)
     
     # Check content-type header if available
     if response_headers:
-        content_type = response_headers.get('content-type', '').lower()
-        if 'jpeg' in content_type or 'jpg' in content_type:
-            return '.jpg'
-        elif 'png' in content_type:
-            return '.png'
-        elif 'webp' in content_type:
-            return '.webp'
-        elif 'avif' in content_type:
-            return '.avif'
-        elif 'gif' in content_type:
-            return '.gif'
+        match = _CONTENT_TYPE_RE.search(response_headers.get('content-type', '').lower())
+        if match:
+            return _CONTENT_TYPE_EXTENSIONS[match.group(0)]
     
     # Check URL for format hints (common in TikTok URLs)
-    if '.avif' in url_lower or 'avif' in url_lower:
+    if 'avif' in url_lower:
         return '.avif'
-    elif '.webp' in url_lower or 'webp' in url_lower:
+    elif 'webp' in url_lower:
         return '.webp'
     
     # Default to jpg for TikTok thumbnails
     return '.jpg'
 
 
+def _thumbnail_fields(post: Dict) -> Dict:
+    """Trim a post to the fields download_thumbnails uses."""
+    slim = {k: post[k] for k in ('id', 'desc', 'createTime', 'stats') if k in post}
+    video = post.get('video') or {}
+    slim['video'] = {k: video[k] for k in _THUMBNAIL_VIDEO_KEYS if k in video}
+    return slim
+
+
 def download_thumbnails(
     posts_file: Path,
     output_dir: Optional[Path] = None,
     thumbnail_type: str = "cover",
     update_mode: bool = False,
-    skip_existing: bool = False
+    skip_existing: bool = False,
+    max_workers: int = 16
 ) -> Dict:
     """
     Download thumbnails for all posts in a JSON file.
@@ -158,6 +198,7 @@ def download_thumbnails(
         thumbnail_type: Type of thumbnail to download (cover, origin, dynamic, zoom_240-960)
         update_mode: Only download thumbnails for new posts
         skip_existing: Skip posts that already have thumbnail files on disk
+        max_workers: Number of concurrent downloads
         
     Returns:
         Dictionary with download results
@@ -169,13 +210,11 @@ def download_thumbnails(
     if not posts_file.exists():
         raise FileNotFoundError(f"Posts file not found: {posts_file}")
     
-    # Load posts
+    # Load posts, keeping only the fields needed here
     print(f"Loading posts from {posts_file}...")
-    with open(posts_file, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    data, posts = load_records(posts_file, 'posts', _thumbnail_fields)
     
     username = data.get('username', 'unknown')
-    posts = data.get('posts', [])
     
     print(f"Found {len(posts)} posts for @{username}")
     print(f"Thumbnail type: {thumbnail_type}")
@@ -195,14 +234,23 @@ def download_thumbnails(
     if update_mode and thumbnails_json_path.exists():
         print(f"\nUpdate mode: Loading existing thumbnail data...")
         try:
-            with open(thumbnails_json_path, 'r', encoding='utf-8') as f:
-                existing_data = json.load(f)
-                existing_thumbnails = existing_data.get('thumbnails', [])
-                processed_post_ids = {t['post_id'] for t in existing_thumbnails}
-                print(f"  Found {len(existing_thumbnails)} existing thumbnails")
+            existing_data = load_json(thumbnails_json_path)
+            existing_thumbnails = existing_data.get('thumbnails', [])
+            processed_post_ids = {t['post_id'] for t in existing_thumbnails}
+            print(f"  Found {len(existing_thumbnails)} existing thumbnails")
         except Exception as e:
             print(f"  Warning: Could not load existing thumbnails: {e}")
     
+    # Records from this run are journaled as they complete, so an interrupted
+    # update can pick them up next time instead of starting over
+    journal_path = output_dir / f"{username}_thumbnails.partial.jsonl"
+    
+    if update_mode and journal_path.exists():
+        recovered = [t for t in read_jsonl(journal_path) if t.get('post_id') not in processed_post_ids]
+        existing_thumbnails.extend(recovered)
+        processed_post_ids.update(t['post_id'] for t in recovered)
+        print(f"  Recovered {len(recovered)} thumbnails from an interrupted run")
+    
     results = {
         'total_posts': len(posts),
         'thumbnails_found': 0,
@@ -212,7 +260,11 @@ def download_thumbnails(
         'thumbnails': existing_thumbnails.copy()
     }
     
-    # Process each post
+    # List the output directory once instead of checking each file separately
+    existing_files = {entry.name for entry in os.scandir(output_dir)} if skip_existing else set()
+    
+    # Work out which posts need a download
+    jobs = []
     for i, post in enumerate(posts, 1):
         post_id = post.get('id', f'post_{i}')
         desc = post.get('desc', '')[:50]
@@ -241,53 +293,66 @@ def download_thumbnails(
         thumbnail_file = output_dir / f"{post_id}{extension}"
         
         # Skip if file already exists (protects manual edits/organization)
-        if skip_existing and thumbnail_file.exists():
+        if skip_existing and thumbnail_file.name in existing_files:
             print(f"  Thumbnail file exists, skipping to protect existing file...")
             results['skipped_existing'] += 1
             continue
         
-        print(f"  Downloading {thumbnail_type} thumbnail...")
-        
-        # Download thumbnail
-        success = download_thumbnail(thumbnail_url, thumbnail_file)
-        
-        if not success:
-            results['failed'] += 1
-            continue
-        
-        results['thumbnails_downloaded'] += 1
-        
-        # Store thumbnail data
-        file_size = thumbnail_file.stat().st_size
-        thumbnail_data = {
-            'post_id': post_id,
-            'description': post.get('desc', ''),
-            'create_time': post.get('createTime', 0),
-            'thumbnail_type': thumbnail_type,
-            'thumbnail_url': thumbnail_url,
-            'file_path': str(thumbnail_file),
-            'file_size': file_size,
-            'extension': extension,
-            'stats': post.get('stats', {})
-        }
-        
-        results['thumbnails'].append(thumbnail_data)
+        jobs.append((post, post_id, thumbnail_url, extension, thumbnail_file))
+    
+    # Download thumbnails concurrently (network-bound, so threads overlap the waits)
+    if jobs:
+        # No point starting more threads than there are downloads
+        workers = max(1, min(max_workers, len(jobs)))
+        print(f"\nDownloading {len(jobs)} {thumbnail_type} thumbnails ({workers} workers)...")
+        ensure_pool_size(_session, workers)
         
-        print(f"  Saved thumbnail ({file_size / 1024:.1f} KB)")
+        with open(journal_path, 'ab' if update_mode else 'wb') as journal, \
+                ThreadPoolExecutor(max_workers=workers, thread_name_prefix="thumb") as executor:
+            outcomes = executor.map(lambda job: download_thumbnail(job[2], job[4]), jobs)
+            
+            for (post, post_id, thumbnail_url, extension, thumbnail_file), success in zip(jobs, outcomes):
+                if not success:
+                    results['failed'] += 1
+                    continue
+                
+                results['thumbnails_downloaded'] += 1
+                
+                # Store thumbnail data
+                file_size = thumbnail_file.stat().st_size
+                thumbnail_data = {
+                    'post_id': post_id,
+                    'description': post.get('desc', ''),
+                    'create_time': post.get('createTime', 0),
+                    'thumbnail_type': thumbnail_type,
+                    'thumbnail_url': thumbnail_url,
+                    'file_path': str(thumbnail_file),
+                    'file_size': file_size,
+                    'extension': extension,
+                    'stats': post.get('stats', {})
+                }
+                
+                results['thumbnails'].append(thumbnail_data)
+                journal.write(dumps_line(thumbnail_data))
+                journal.flush()
+                
+                print(f"  Saved thumbnail for {post_id} ({file_size / 1024:.1f} KB)")
     
     # Save JSON with all thumbnail data
-    with open(thumbnails_json_path, 'w', encoding='utf-8') as f:
-        json.dump({
-            'username': username,
-            'thumbnail_type': thumbnail_type,
-            'summary': {
-                'total_posts': results['total_posts'],
-                'thumbnails_found': results['thumbnails_found'],
-                'thumbnails_downloaded': results['thumbnails_downloaded'],
-                'failed': results['failed']
-            },
-            'thumbnails': results['thumbnails']
-        }, f, indent=2, ensure_ascii=False)
+    write_json(thumbnails_json_path, {
+        'username': username,
+        'thumbnail_type': thumbnail_type,
+        'summary': {
+            'total_posts': results['total_posts'],
+            'thumbnails_found': results['thumbnails_found'],
+            'thumbnails_downloaded': results['thumbnails_downloaded'],
+            'failed': results['failed']
+        },
+        'thumbnails': results['thumbnails']
+    })
+    
+    # Everything is in the JSON file now
+    journal_path.unlink(missing_ok=True)
     
     print(f"\nSaved thumbnail data to {thumbnails_json_path}")
     print(f"\nSummary:")
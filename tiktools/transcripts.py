@@ -2,11 +2,33 @@
 Functions for extracting transcripts from TikTok videos using subtitle files.
 """
 
-import json
+import io
+import os
+import re
 import requests
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional, Dict, List
 
+from ._files import write_text_if_changed
+from ._http import create_session, ensure_pool_size
+from ._json import dumps_line, load_json, load_records, read_jsonl, write_json
+from .cache import DiskCache
+
+# Shared by all subtitle downloads so CDN connections are reused
+_session = create_session()
+
+
+# Header line that starts the cue text
+_WEBVTT_HEADER_RE = re.compile(r'^[^\S\n]*WEBVTT', re.MULTILINE)
+
+# A non-blank line that is not a header, cue number or cue timing line
+_WEBVTT_TEXT_RE = re.compile(
+    r'^[^\S\n]*(?!WEBVTT)(?!\d+[^\S\n]*$)(?![^\n]*-->)(\S[^\n]*?)[^\S\n]*$',
+    re.MULTILINE
+)
+
 
 def parse_webvtt(content: str) -> str:
     """
@@ -18,44 +40,88 @@ def parse_webvtt(content: str) -> str:
     Returns:
         Clean transcript text with timestamps removed
     """
-    lines = content.strip().split('\n')
-    transcript_lines = []
-    
-    in_content = False
-    for line in lines:
-        line = line.strip()
-        
-        if line.startswith('WEBVTT'):
-            in_content = True
-            continue
-        
-        if '-->' in line or not line or line.isdigit():
-            continue
-        
-        if in_content and line:
-            transcript_lines.append(line)
+    header = _WEBVTT_HEADER_RE.search(content)
+    if not header:
+        return ''
     
-    return ' '.join(transcript_lines)
+    return ' '.join(_WEBVTT_TEXT_RE.findall(content, header.end()))
 
 
-def download_subtitle(url: str, timeout: int = 30) -> Optional[str]:
+def download_subtitle(
+    url: str,
+    timeout: int = 30,
+    cache: Optional[DiskCache] = None,
+    session: Optional[requests.Session] = None
+) -> Optional[str]:
     """
     Download subtitle file from URL.
     
     Args:
         url: Subtitle file URL
         timeout: Request timeout in seconds
+        cache: Optional on-disk cache to read from and store into
+        session: Session to download with (defaults to a shared pooled session)
         
     Returns:
         Subtitle file content as string, or None if download fails
     """
+    params = {'url': url}
+    headers = {}
+    stale = None
+    
+    if cache is not None:
+        cached = cache.get('subtitle', params)
+        if cached is not None:
+            return cached
+        
+        # An expired entry can still be revalidated instead of downloaded again
+        stale = cache.get_stale('subtitle', params)
+        if stale is not None:
+            validators = stale[1]
+            if validators.get('etag'):
+                headers['If-None-Match'] = validators['etag']
+            if validators.get('last_modified'):
+                headers['If-Modified-Since'] = validators['last_modified']
+    
     try:
-        response = requests.get(url, timeout=timeout)
+        response = (session or _session).get(url, timeout=timeout, headers=headers)
+        if response.status_code == 304 and stale is not None:
+            cache.set('subtitle', params, stale[0], meta=stale[1])
+            return stale[0]
         response.raise_for_status()
-        return response.text
     except Exception as e:
         print(f"  X Failed to download subtitle: {e}")
         return None
+    
+    if cache is not None:
+        cache.set('subtitle', params, response.text, meta={
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified')
+        })
+    
+    return response.text
+
+
+def _transcript_fields(post: Dict) -> Dict:
+    """Trim a post to the fields extract_transcripts uses."""
+    slim = {k: post[k] for k in ('id', 'desc', 'createTime', 'music', 'stats') if k in post}
+    video = post.get('video') or {}
+    slim['video'] = {'subtitleInfos': video['subtitleInfos']} if 'subtitleInfos' in video else {}
+    return slim
+
+
+def _download_transcript(url: str, cache: Optional[DiskCache] = None) -> Optional[str]:
+    """Download and parse one subtitle file, returning None if the download fails."""
+    content = download_subtitle(url, cache=cache)
+    if not content:
+        return None
+    return parse_webvtt(content)
+
+
+@lru_cache(maxsize=256)
+def _language_prefix(language_code_name: str) -> str:
+    """Return the language part of a code like 'eng-US'."""
+    return language_code_name.split('-', 1)[0]
 
 
 def get_best_subtitle(post: Dict, preferred_language: str = "eng") -> Optional[Dict]:
@@ -74,26 +140,24 @@ def get_best_subtitle(post: Dict, preferred_language: str = "eng") -> Optional[D
     if 'video' not in post or 'subtitleInfos' not in post['video']:
         return None
     
-    subtitles = post['video']['subtitleInfos']
+    # Single pass: return a preferred-language ASR subtitle as soon as one turns up,
+    # and remember the first fallback of each kind on the way
+    any_asr = None
+    preferred_any = None
     
-    # First try ASR in preferred language
-    for subtitle in subtitles:
-        lang_code = subtitle.get('LanguageCodeName', '').split('-')[0]
-        if lang_code == preferred_language and subtitle.get('Source') == 'ASR':
-            return subtitle
-    
-    # Fall back to any ASR subtitle
-    for subtitle in subtitles:
-        if subtitle.get('Source') == 'ASR':
-            return subtitle
-    
-    # Last resort: any subtitle in preferred language
-    for subtitle in subtitles:
-        lang_code = subtitle.get('LanguageCodeName', '').split('-')[0]
-        if lang_code == preferred_language:
+    for subtitle in post['video']['subtitleInfos']:
+        is_preferred = _language_prefix(subtitle.get('LanguageCodeName', '')) == preferred_language
+        is_asr = subtitle.get('Source') == 'ASR'
+        
+        if is_preferred and is_asr:
             return subtitle
+        if is_asr and any_asr is None:
+            any_asr = subtitle
+        if is_preferred and preferred_any is None:
+            preferred_any = subtitle
     
-    return None
+    # Fall back to any ASR subtitle, then any subtitle in preferred language
+    return any_asr or preferred_any
 
 
 def extract_transcripts(
@@ -102,7 +166,9 @@ def extract_transcripts(
     output_format: str = "individual",
     language: str = "eng",
     update_mode: bool = False,
-    skip_existing: bool = False
+    skip_existing: bool = False,
+    max_workers: int = 16,
+    cache: Optional[DiskCache] = None
 ) -> Dict:
     """
     Extract transcripts from all posts in a JSON file.
@@ -114,6 +180,8 @@ def extract_transcripts(
         language: Preferred language code for subtitles
         update_mode: Only process new posts
         skip_existing: Skip posts that already have transcript files on disk (protects manual edits)
+        max_workers: Number of concurrent subtitle downloads
+        cache: Optional on-disk cache for subtitle downloads
         
     Returns:
         Dictionary with extraction results
@@ -125,13 +193,11 @@ def extract_transcripts(
     if not posts_file.exists():
         raise FileNotFoundError(f"Posts file not found: {posts_file}")
     
-    # Load posts
+    # Load posts, keeping only the fields needed here
     print(f"Loading posts from {posts_file}...")
-    with open(posts_file, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    data, posts = load_records(posts_file, 'posts', _transcript_fields)
     
     username = data.get('username', 'unknown')
-    posts = data.get('posts', [])
     
     print(f"Found {len(posts)} posts for @{username}")
     
@@ -150,14 +216,23 @@ def extract_transcripts(
     if update_mode and transcripts_json_path.exists():
         print(f"\nUpdate mode: Loading existing transcripts...")
         try:
-            with open(transcripts_json_path, 'r', encoding='utf-8') as f:
-                existing_data = json.load(f)
-                existing_transcripts = existing_data.get('transcripts', [])
-                processed_post_ids = {t['post_id'] for t in existing_transcripts}
-                print(f"  Found {len(existing_transcripts)} existing transcripts")
+            existing_data = load_json(transcripts_json_path)
+            existing_transcripts = existing_data.get('transcripts', [])
+            processed_post_ids = {t['post_id'] for t in existing_transcripts}
+            print(f"  Found {len(existing_transcripts)} existing transcripts")
         except Exception as e:
             print(f"  Warning: Could not load existing transcripts: {e}")
     
+    # Records from this run are journaled as they complete, so an interrupted
+    # update can pick them up next time instead of starting over
+    journal_path = output_dir / f"{username}_transcripts.partial.jsonl"
+    
+    if update_mode and journal_path.exists():
+        recovered = [t for t in read_jsonl(journal_path) if t.get('post_id') not in processed_post_ids]
+        existing_transcripts.extend(recovered)
+        processed_post_ids.update(t['post_id'] for t in recovered)
+        print(f"  Recovered {len(recovered)} transcripts from an interrupted run")
+    
     results = {
         'total_posts': len(posts),
         'transcripts_found': 0,
@@ -167,7 +242,11 @@ def extract_transcripts(
         'transcripts': existing_transcripts.copy()
     }
     
-    # Process each post
+    # List the output directory once instead of checking each file separately
+    existing_files = {entry.name for entry in os.scandir(output_dir)} if skip_existing else set()
+    
+    # Work out which posts need a subtitle download
+    jobs = []
     for i, post in enumerate(posts, 1):
         post_id = post.get('id', f'post_{i}')
         desc = post.get('desc', '')[:50]
@@ -182,17 +261,14 @@ def extract_transcripts(
             continue
         
         # Skip if transcript file already exists (protects manual edits)
-        if skip_existing:
-            transcript_file = output_dir / f"{post_id}.txt"
-            if transcript_file.exists():
-                print(f"  Transcript file exists, skipping to protect manual edits...")
-                results['skipped_existing'] += 1
-                continue
+        if skip_existing and f"{post_id}.txt" in existing_files:
+            print(f"  Transcript file exists, skipping to protect manual edits...")
+            results['skipped_existing'] += 1
+            continue
         
         # Check audio type
         music = post.get('music', {})
         is_original_audio = music.get('original', False)
-        music_author = music.get('authorName', '')
         
         # Get subtitle
         subtitle = get_best_subtitle(post, language)
@@ -204,65 +280,79 @@ def extract_transcripts(
         
         results['transcripts_found'] += 1
         
-        subtitle_url = subtitle.get('Url')
-        lang_name = subtitle.get('LanguageCodeName', 'unknown')
-        source = subtitle.get('Source', 'unknown')
-        
-        print(f"  Found subtitle: {lang_name} ({source})")
+        print(f"  Found subtitle: {subtitle.get('LanguageCodeName', 'unknown')} "
+              f"({subtitle.get('Source', 'unknown')})")
         
         if not is_original_audio:
             print(f"  WARNING: Non-original audio - may contain song lyrics")
         
-        # Download subtitle
-        subtitle_content = download_subtitle(subtitle_url)
-        
-        if not subtitle_content:
-            results['failed'] += 1
-            continue
-        
-        # Parse transcript
-        transcript = parse_webvtt(subtitle_content)
-        
-        if not transcript:
-            print("  X Failed to parse transcript")
-            results['failed'] += 1
-            continue
-        
-        results['transcripts_downloaded'] += 1
-        
-        # Store transcript data
-        transcript_data = {
-            'post_id': post_id,
-            'description': post.get('desc', ''),
-            'create_time': post.get('createTime', 0),
-            'transcript': transcript,
-            'language': lang_name,
-            'source': source,
-            'is_original_audio': is_original_audio,
-            'music_author': music_author,
-            'stats': post.get('stats', {})
-        }
-        
-        results['transcripts'].append(transcript_data)
+        jobs.append((post, post_id, subtitle))
+    
+    # Download and parse subtitles concurrently (network-bound, so threads overlap the waits)
+    if jobs:
+        print(f"\nDownloading {len(jobs)} subtitles ({max_workers} workers)...")
+        ensure_pool_size(_session, max_workers)
         
-        # Save individual file
-        if output_format in ["individual", "both"]:
-            transcript_file = output_dir / f"{post_id}.txt"
-            with open(transcript_file, 'w', encoding='utf-8') as f:
-                f.write(f"Post ID: {post_id}\n")
-                f.write(f"Description: {post.get('desc', '')}\n")
-                f.write(f"Language: {lang_name} ({source})\n")
-                f.write(f"Original Audio: {is_original_audio}\n")
-                if not is_original_audio:
-                    f.write(f"WARNING: Non-original audio - may contain song lyrics\n")
-                f.write(f"\n{transcript}\n")
+        with open(journal_path, 'ab' if update_mode else 'wb') as journal, \
+                ThreadPoolExecutor(max_workers=max_workers) as executor:
+            # Workers download and parse, so parsing overlaps with other downloads
+            parsed = executor.map(
+                lambda job: _download_transcript(job[2].get('Url'), cache=cache), jobs
+            )
             
-            print(f"  Saved transcript ({len(transcript)} chars)")
+            for (post, post_id, subtitle), transcript in zip(jobs, parsed):
+                if transcript is None:
+                    results['failed'] += 1
+                    continue
+                
+                if not transcript:
+                    print(f"  X Failed to parse transcript for {post_id}")
+                    results['failed'] += 1
+                    continue
+                
+                results['transcripts_downloaded'] += 1
+                
+                music = post.get('music', {})
+                is_original_audio = music.get('original', False)
+                lang_name = subtitle.get('LanguageCodeName', 'unknown')
+                source = subtitle.get('Source', 'unknown')
+                
+                # Store transcript data
+                transcript_data = {
+                    'post_id': post_id,
+                    'description': post.get('desc', ''),
+                    'create_time': post.get('createTime', 0),
+                    'transcript': transcript,
+                    'language': lang_name,
+                    'source': source,
+                    'is_original_audio': is_original_audio,
+                    'music_author': music.get('authorName', ''),
+                    'stats': post.get('stats', {})
+                }
+                
+                results['transcripts'].append(transcript_data)
+                journal.write(dumps_line(transcript_data))
+                journal.flush()
+                
+                # Save individual file
+                if output_format in ["individual", "both"]:
+                    transcript_file = output_dir / f"{post_id}.txt"
+                    with io.StringIO() as f:
+                        f.write(f"Post ID: {post_id}\n")
+                        f.write(f"Description: {post.get('desc', '')}\n")
+                        f.write(f"Language: {lang_name} ({source})\n")
+                        f.write(f"Original Audio: {is_original_audio}\n")
+                        if not is_original_audio:
+                            f.write(f"WARNING: Non-original audio - may contain song lyrics\n")
+                        f.write(f"\n{transcript}\n")
+                        write_text_if_changed(transcript_file, f.getvalue())
+                    
+                    print(f"  Saved transcript for {post_id} ({len(transcript)} chars)")
     
     # Save combined file if requested
     if output_format in ["combined", "both"]:
         combined_file = output_dir / f"{username}_all_transcripts.txt"
-        with open(combined_file, 'w', encoding='utf-8') as f:
+        with io.StringIO() as f:
             f.write(f"Transcripts for @{username}\n")
             f.write(f"Total transcripts: {results['transcripts_downloaded']}\n")
             f.write("=" * 80 + "\n\n")
@@ -274,21 +364,25 @@ def extract_transcripts(
                 f.write("-" * 80 + "\n")
                 f.write(f"{t_data['transcript']}\n")
                 f.write("=" * 80 + "\n\n")
+            
+            write_text_if_changed(combined_file, f.getvalue())
         
         print(f"\nSaved combined transcripts to {combined_file}")
     
     # Save JSON with all transcript data
-    with open(transcripts_json_path, 'w', encoding='utf-8') as f:
-        json.dump({
-            'username': username,
-            'summary': {
-                'total_posts': results['total_posts'],
-                'transcripts_found': results['transcripts_found'],
-                'transcripts_downloaded': results['transcripts_downloaded'],
-                'failed': results['failed']
-            },
-            'transcripts': results['transcripts']
-        }, f, indent=2, ensure_ascii=False)
+    write_json(transcripts_json_path, {
+        'username': username,
+        'summary': {
+            'total_posts': results['total_posts'],
+            'transcripts_found': results['transcripts_found'],
+            'transcripts_downloaded': results['transcripts_downloaded'],
+            'failed': results['failed']
+        },
+        'transcripts': results['transcripts']
+    })
+    
+    # Everything is in the JSON file now
+    journal_path.unlink(missing_ok=True)
     
     print(f"\nSaved transcript data to {transcripts_json_path}")
     
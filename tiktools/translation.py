@@ -2,11 +2,51 @@
 Functions for translating TikTok transcripts using cloud translation services.
 """
 
-import json
+import io
+import re
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional, Dict, List, Protocol
+from typing import Optional, Dict, List, Protocol, Tuple
 from abc import ABC, abstractmethod
 
+from ._files import write_text_if_changed
+from ._json import dumps_line, load_json, load_records, read_jsonl, write_json
+from .cache import DiskCache, NO_EXPIRY
+from ._http import ensure_pool_size
+from .transcripts import _download_transcript, _session as _subtitle_session
+
+
+# Short transcripts are packed into one request, joined by numbered marker lines that
+# translation leaves alone; the numbers let a mangled split be detected.
+# AWS TranslateText accepts up to 10,000 bytes per call; leave headroom for expansion.
+_BATCH_MAX_BYTES = 4500
+_BATCH_MARKER = "\n\n[[{}]]\n\n"
+_BATCH_SPLIT_RE = re.compile(r'\s*\[\[(\d+)\]\]\s*')
+
+# Texts too long for a single request are split at sentence ends into chunks of this size
+_MAX_REQUEST_BYTES = 9000
+_SENTENCE_END_RE = re.compile(r'(?<=[.!?。！？])\s+')
+
+# 3-letter (ISO 639-2, as used in TikTok subtitle names) to 2-letter codes
+_ISO_3TO2 = {
+    'eng': 'en',
+    'spa': 'es',
+    'fra': 'fr',
+    'deu': 'de',
+    'ita': 'it',
+    'por': 'pt',
+    'rus': 'ru',
+    'jpn': 'ja',
+    'kor': 'ko',
+    'zho': 'zh',
+    'ara': 'ar',
+}
+
+
+class BatchSplitError(ValueError):
+    """A batched translation came back without its markers intact, so it can't be split."""
+
 
 class TranslationService(ABC):
     """Abstract base class for translation services."""
@@ -26,6 +66,23 @@ class TranslationService(ABC):
         """
         pass
     
+    def translate_batch(self, texts: List[str], source_language: str, target_language: str) -> List[str]:
+        """
+        Translate several texts that share a language pair.
+        
+        Services with high per-request overhead can override this to send
+        the texts in fewer calls. The default translates them one at a time.
+        
+        Args:
+            texts: Texts to translate
+            source_language: Source language code (e.g., 'es', 'en')
+            target_language: Target language code (e.g., 'en', 'es')
+            
+        Returns:
+            Translated texts, in the same order
+        """
+        return [self.translate(text, source_language, target_language) for text in texts]
+    
     @abstractmethod
     def detect_language(self, text: str) -> str:
         """
@@ -56,12 +113,17 @@ class TranslationService(ABC):
 class AWSTranslateService(TranslationService):
     """AWS Translate translation service."""
     
-    def __init__(self, region_name: str = "us-east-1"):
+    def __init__(self, region_name: str = "us-east-1", max_pool_connections: int = 16):
         """
         Initialize AWS Translate client.
         
+        The client is thread-safe and shared by all translation workers.
+        Credentials are checked locally; no API call is made until the
+        first translation.
+        
         Args:
             region_name: AWS region name
+            max_pool_connections: HTTP connections kept open to AWS (match the worker count)
             
         Raises:
             ImportError: If boto3 is not installed
@@ -69,29 +131,43 @@ class AWSTranslateService(TranslationService):
         """
         try:
             import boto3
-            from botocore.exceptions import NoCredentialsError
+            from botocore.config import Config
         except ImportError:
             raise ImportError(
                 "boto3 is required for AWS Translate. Install it with: pip install boto3"
             )
         
-        try:
-            self.client = boto3.client('translate', region_name=region_name)
-            # Test credentials by making a simple call
-            self.client.list_languages()
-        except NoCredentialsError:
+        # One session for every client this service creates
+        session = boto3.Session(region_name=region_name)
+        if session.get_credentials() is None:
             raise ValueError(
                 "AWS credentials not configured. Set up credentials via:\n"
                 "  - AWS CLI: aws configure\n"
                 "  - Environment variables: AWS_ACCESS_KEY_ID, AWS_SECRET_ACCESS_KEY\n"
                 "  - IAM role (if running on EC2/Lambda)"
             )
+        
+        config = Config(
+            max_pool_connections=max_pool_connections,
+            retries={'max_attempts': 10, 'mode': 'adaptive'}
+        )
+        # Both clients are built here because boto3 sessions aren't thread-safe,
+        # and the clients themselves are used from worker threads
+        self.client = session.client('translate', config=config)
+        self._comprehend = session.client('comprehend', config=config)
     
     def translate(self, text: str, source_language: str, target_language: str) -> str:
         """Translate text using AWS Translate."""
         if not text.strip():
             return text
         
+        if len(text.encode('utf-8')) > _MAX_REQUEST_BYTES:
+            # Over the request size limit, so translate it a chunk at a time
+            return ' '.join(
+                self.translate(chunk, source_language, target_language)
+                for chunk in _split_for_translate(text)
+            )
+        
         response = self.client.translate_text(
             Text=text,
             SourceLanguageCode=source_language,
@@ -100,31 +176,49 @@ class AWSTranslateService(TranslationService):
         
         return response['TranslatedText']
     
+    def translate_batch(self, texts: List[str], source_language: str, target_language: str) -> List[str]:
+        """Translate several texts in a single AWS Translate call."""
+        if len(texts) == 1:
+            return [self.translate(texts[0], source_language, target_language)]
+        
+        joined = texts[0] + ''.join(_BATCH_MARKER.format(i) + text for i, text in enumerate(texts[1:], 1))
+        translated = self.translate(joined, source_language, target_language)
+        
+        # re.split with a group alternates text and marker numbers: [text, '1', text, '2', text]
+        pieces = _BATCH_SPLIT_RE.split(translated.strip())
+        parts, numbers = pieces[::2], pieces[1::2]
+        
+        if numbers != [str(i) for i in range(1, len(texts))]:
+            # Re-sending is the caller's decision, since this request has already been billed
+            raise BatchSplitError(
+                f"Batch of {len(texts)} texts came back with markers {numbers}, can't split it"
+            )
+        
+        return parts
+    
     def detect_language(self, text: str) -> str:
         """Detect language using AWS Comprehend."""
-        try:
-            import boto3
-        except ImportError:
-            raise ImportError("boto3 is required for language detection")
-        
-        comprehend = boto3.client('comprehend', region_name='us-east-1')
-        response = comprehend.detect_dominant_language(Text=text[:5000])  # Max 5000 chars
+        response = self._comprehend.detect_dominant_language(Text=text[:5000])  # Max 5000 chars
         
         if response['Languages']:
             return response['Languages'][0]['LanguageCode']
         
         return 'unknown'
     
-    def estimate_cost(self, char_count: int) -> float:
+    @staticmethod
+    def estimate_cost(char_count: int) -> float:
         """
         Estimate AWS Translate cost.
         
+        Needs no client, so estimates work without AWS credentials.
+        
         AWS Translate pricing (as of 2024):
         - $15 per million characters
         """
         return (char_count / 1_000_000) * 15.0
 
 
+@lru_cache(maxsize=256)
 def normalize_language_code(code: str) -> str:
     """
     Normalize language code to 2-letter ISO 639-1 format.
@@ -142,21 +236,7 @@ def normalize_language_code(code: str) -> str:
         code = code.split('-')[0]
     
     # Map 3-letter to 2-letter codes
-    mapping = {
-        'eng': 'en',
-        'spa': 'es',
-        'fra': 'fr',
-        'deu': 'de',
-        'ita': 'it',
-        'por': 'pt',
-        'rus': 'ru',
-        'jpn': 'ja',
-        'kor': 'ko',
-        'zho': 'zh',
-        'ara': 'ar',
-    }
-    
-    return mapping.get(code, code)
+    return _ISO_3TO2.get(code, code)
 
 
 def check_tiktok_subtitles(post: Dict, target_language: str) -> Optional[Dict]:
@@ -170,21 +250,90 @@ def check_tiktok_subtitles(post: Dict, target_language: str) -> Optional[Dict]:
     Returns:
         Subtitle info dict or None if not found
     """
-    if 'video' not in post or 'subtitleInfos' not in post['video']:
-        return None
+    return _subtitle_index(post).get(normalize_language_code(target_language))
+
+
+def _subtitle_index(post: Dict) -> Dict[str, Dict]:
+    """Map each normalized language code to the first subtitle a post has in it."""
+    index: Dict[str, Dict] = {}
+    for subtitle in post.get('video', {}).get('subtitleInfos', []):
+        lang_code = subtitle.get('LanguageCodeName', '')
+        index.setdefault(normalize_language_code(lang_code.split('-')[0]), subtitle)
+    return index
+
+
+def _split_for_translate(text: str, max_bytes: int = _MAX_REQUEST_BYTES) -> List[str]:
+    """
+    Split text into chunks of at most max_bytes (UTF-8), at sentence ends where possible.
     
-    subtitles = post['video']['subtitleInfos']
-    normalized_target = normalize_language_code(target_language)
+    Sentences longer than max_bytes are split between words, and single
+    words longer than that are cut.
+    """
+    pieces = []
+    for sentence in _SENTENCE_END_RE.split(text):
+        if len(sentence.encode('utf-8')) <= max_bytes:
+            pieces.append(sentence)
+            continue
+        
+        for word in sentence.split():
+            while len(word.encode('utf-8')) > max_bytes:
+                cut = word.encode('utf-8')[:max_bytes].decode('utf-8', 'ignore')
+                pieces.append(cut)
+                word = word[len(cut):]
+            pieces.append(word)
+    
+    # Pack pieces greedily; the +1 covers the space they're joined with
+    chunks = []
+    current: List[str] = []
+    size = 0
+    for piece in pieces:
+        piece_size = len(piece.encode('utf-8')) + 1
+        if current and size + piece_size > max_bytes:
+            chunks.append(' '.join(current))
+            current, size = [], 0
+        current.append(piece)
+        size += piece_size
+    
+    if current:
+        chunks.append(' '.join(current))
+    
+    return chunks
+
+
+def _translation_cache_params(text: str, source_language: str, target_language: str) -> Dict:
+    """Return the DiskCache parameters that identify a translation."""
+    return {'source': source_language, 'target': target_language, 'text': text}
+
+
+def _pack_batches(jobs: List[Tuple[Dict, str, str]]) -> List[List[Tuple[Dict, str, str]]]:
+    """
+    Group (transcript_data, source, target) jobs into batches for translate_batch.
     
-    # Look for subtitle in target language (prefer ASR over MT)
-    for subtitle in subtitles:
-        lang_code = subtitle.get('LanguageCodeName', '')
-        normalized_code = normalize_language_code(lang_code.split('-')[0])
+    Jobs sharing a language pair are packed greedily, in order, until a batch
+    reaches _BATCH_MAX_BYTES. Longer transcripts get a batch of their own.
+    """
+    groups: Dict[Tuple[str, str], List[Tuple[Dict, str, str]]] = {}
+    for job in jobs:
+        groups.setdefault((job[1], job[2]), []).append(job)
+    
+    separator_size = len(_BATCH_MARKER.format(999).encode('utf-8'))
+    batches = []
+    for group in groups.values():
+        batch: List[Tuple[Dict, str, str]] = []
+        batch_size = 0
+        
+        for job in group:
+            size = len(job[0].get('transcript', '').encode('utf-8')) + separator_size
+            if batch and batch_size + size > _BATCH_MAX_BYTES:
+                batches.append(batch)
+                batch, batch_size = [], 0
+            batch.append(job)
+            batch_size += size
         
-        if normalized_code == normalized_target:
-            return subtitle
+        if batch:
+            batches.append(batch)
     
-    return None
+    return batches
 
 
 def translate_transcripts(
@@ -194,7 +343,10 @@ def translate_transcripts(
     output_dir: Optional[Path] = None,
     update_mode: bool = False,
     estimate_only: bool = False,
-    source_language: Optional[str] = None
+    source_language: Optional[str] = None,
+    max_workers: int = 16,
+    batch_requests: bool = True,
+    cache: Optional[DiskCache] = None
 ) -> Dict:
     """
     Translate transcripts to target languages.
@@ -209,6 +361,9 @@ def translate_transcripts(
         update_mode: Only translate new transcripts
         estimate_only: Only estimate costs without translating
         source_language: Source language code (auto-detected if None)
+        max_workers: Number of concurrent translation requests
+        batch_requests: Pack short transcripts with the same language pair into one request
+        cache: Optional on-disk cache of service translations, so identical text is only billed once
         
     Returns:
         Dictionary with translation results
@@ -226,8 +381,7 @@ def translate_transcripts(
     
     # Load transcripts
     print(f"Loading transcripts from {transcripts_file}...")
-    with open(transcripts_file, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    data = load_json(transcripts_file)
     
     username = data.get('username', 'unknown')
     transcripts = data.get('transcripts', [])
@@ -244,38 +398,54 @@ def translate_transcripts(
     output_dir.mkdir(exist_ok=True, parents=True)
     
     # Initialize translation service
+    if service == "aws":
+        service_class = AWSTranslateService
+    else:
+        raise ValueError(
+            f"Unsupported translation service: {service}. "
+            f"Currently supported: aws"
+        )
+    
     translation_service = None
     if not estimate_only:
-        if service == "aws":
-            print(f"\nInitializing AWS Translate service...")
-            translation_service = AWSTranslateService()
-        else:
-            raise ValueError(
-                f"Unsupported translation service: {service}. "
-                f"Currently supported: aws"
-            )
+        print(f"\nInitializing AWS Translate service...")
+        translation_service = service_class(max_pool_connections=max_workers)
     
     # Load existing translations if in update mode
     existing_translations = {}
     translations_json_path = output_dir / f"{username}_translations.json"
     
+    # Translations are journaled as they complete, so finished work is on disk
+    # even if the run dies before the summary JSON is written
+    journal_path = output_dir / f"{username}_translations.partial.jsonl"
+    
     if update_mode and translations_json_path.exists():
         print(f"\nUpdate mode: Loading existing translations...")
         try:
-            with open(translations_json_path, 'r', encoding='utf-8') as f:
-                existing_data = json.load(f)
-                for trans in existing_data.get('translations', []):
-                    key = (trans['post_id'], trans['target_language'])
-                    existing_translations[key] = trans
-                print(f"  Found {len(existing_translations)} existing translations")
+            _, existing = load_records(translations_json_path, 'translations')
+            for trans in existing:
+                key = (trans['post_id'], trans['target_language'])
+                existing_translations[key] = trans
+            print(f"  Found {len(existing_translations)} existing translations")
         except Exception as e:
             print(f"  Warning: Could not load existing translations: {e}")
     
+    if update_mode and journal_path.exists():
+        recovered = 0
+        for trans in read_jsonl(journal_path):
+            key = (trans.get('post_id'), trans.get('target_language'))
+            if key not in existing_translations:
+                existing_translations[key] = trans
+                recovered += 1
+        print(f"  Recovered {recovered} translations from an interrupted run")
+    
     results = {
         'total_transcripts': len(transcripts),
         'translations_created': 0,
         'tiktok_subtitles_used': 0,
         'service_translated': 0,
+        'cached_translations': 0,
+        'retried_characters': 0,
         'failed': 0,
         'skipped_existing': 0,
         'total_characters': 0,
@@ -283,34 +453,45 @@ def translate_transcripts(
         'translations': []
     }
     
-    # Calculate total characters for cost estimate
-    for transcript_data in transcripts:
-        transcript_text = transcript_data.get('transcript', '')
-        results['total_characters'] += len(transcript_text) * len(target_languages)
-    
-    # Estimate costs
-    if translation_service:
-        estimated_cost = translation_service.estimate_cost(results['total_characters'])
-        results['estimated_cost'] = estimated_cost
-        print(f"\nEstimated translation cost: ${estimated_cost:.4f} USD")
-        print(f"  ({results['total_characters']:,} characters × {len(target_languages)} languages)")
-    
-    if estimate_only:
-        print("\nEstimate-only mode: Not performing translations")
-        return results
-    
     # Load posts data to check for TikTok subtitles
     posts_file = transcripts_file.parent.parent / f"{username}_posts.json"
-    posts_by_id = {}
+    if not posts_file.exists():
+        posts_file = posts_file.with_name(f"{posts_file.name}.gz")
+    subtitles_by_post: Dict[str, Dict[str, Dict]] = {}
     
     if posts_file.exists():
         print(f"\nLoading posts data to check for native TikTok subtitles...")
-        with open(posts_file, 'r', encoding='utf-8') as f:
-            posts_data = json.load(f)
-            posts_by_id = {p['id']: p for p in posts_data.get('posts', [])}
-        print(f"  Loaded {len(posts_by_id)} posts")
+        # Posts are streamed and only their subtitle lists kept, indexed by language once
+        # rather than scanned per target language
+        _, indexed = load_records(posts_file, 'posts', lambda p: (p['id'], _subtitle_index(p)))
+        subtitles_by_post = dict(indexed)
+        print(f"  Loaded {len(subtitles_by_post)} posts")
+    
+    # Work out which (transcript, target language) pairs need translating
+    jobs = []
+    native_jobs = []
+    cached_jobs = []
+    
+    def queue_service_job(transcript_data, original_language, target_lang):
+        # Reuse an earlier translation of the same text (re-runs, repeated intros)
+        if cache is not None:
+            cached_text = cache.get(
+                'translation',
+                _translation_cache_params(transcript_data.get('transcript', ''), original_language, target_lang),
+                ttl=NO_EXPIRY
+            )
+            if cached_text is not None:
+                print(f"    Found cached translation")
+                cached_jobs.append((transcript_data, original_language, target_lang, cached_text))
+                return
+        
+        jobs.append((transcript_data, original_language, target_lang))
+    
+    def billed_characters():
+        # Only pairs that go to the translation service are billed, and identical text only once
+        billed = {(job[0].get('transcript', ''), job[1], job[2]) for job in jobs}
+        return sum(len(text) for text, _, _ in billed), len(billed)
     
-    # Process each transcript
     for i, transcript_data in enumerate(transcripts, 1):
         post_id = transcript_data.get('post_id')
         transcript_text = transcript_data.get('transcript', '')
@@ -344,84 +525,217 @@ def translate_transcripts(
                 continue
             
             # Check if TikTok has native subtitles in target language
-            tiktok_subtitle = None
-            if post_id in posts_by_id:
-                tiktok_subtitle = check_tiktok_subtitles(posts_by_id[post_id], target_lang)
+            tiktok_subtitle = subtitles_by_post.get(post_id, {}).get(target_lang)
             
-            if tiktok_subtitle:
+            if tiktok_subtitle and tiktok_subtitle.get('Url'):
                 print(f"    Found TikTok subtitle in {target_lang} - extracting instead of translating")
-                # TODO: Download and parse TikTok subtitle
-                # For now, we'll proceed with translation
-                # results['tiktok_subtitles_used'] += 1
+                native_jobs.append((transcript_data, original_language, target_lang, tiktok_subtitle))
+                continue
             
-            # Translate using service
-            try:
-                print(f"    Translating with {service}...")
-                translated_text = translation_service.translate(
-                    transcript_text,
-                    original_language,
-                    target_lang
+            queue_service_job(transcript_data, original_language, target_lang)
+    
+    # Estimate costs
+    results['total_characters'], billed_count = billed_characters()
+    estimated_cost = (translation_service or service_class).estimate_cost(results['total_characters'])
+    results['estimated_cost'] = estimated_cost
+    print(f"\nEstimated translation cost: ${estimated_cost:.4f} USD")
+    print(f"  ({results['total_characters']:,} characters across {billed_count} translations)")
+    
+    if estimate_only:
+        print("\nEstimate-only mode: Not performing translations")
+        return results
+    
+    def save_translation(transcript_data, original_language, target_lang, translated_text, is_native):
+        # Returns False (and counts a failure) if the translation file can't be written
+        post_id = transcript_data.get('post_id')
+        transcript_text = transcript_data.get('transcript', '')
+        used_service = 'tiktok' if is_native else service
+        
+        # Save individual translation file
+        translation_file = output_dir / f"{post_id}.{target_lang}.txt"
+        try:
+            with io.StringIO() as f:
+                f.write(f"Post ID: {post_id}\n")
+                f.write(f"Description: {transcript_data.get('description', '')}\n")
+                f.write(f"Original Language: {original_language}\n")
+                f.write(f"Target Language: {target_lang}\n")
+                f.write(f"Translation Service: {used_service}\n")
+                f.write(f"\n{translated_text}\n")
+                write_text_if_changed(translation_file, f.getvalue())
+        except OSError as e:
+            print(f"  X Could not save {target_lang} translation for {post_id}: {e}")
+            results['failed'] += 1
+            return False
+        
+        results['translations_created'] += 1
+        
+        # Store translation data
+        translation_data = {
+            'post_id': post_id,
+            'description': transcript_data.get('description', ''),
+            'create_time': transcript_data.get('create_time', 0),
+            'source_language': original_language,
+            'target_language': target_lang,
+            'translation_service': used_service,
+            'is_native_subtitle': is_native,
+            'original_text': transcript_text,
+            'translated_text': translated_text,
+            'character_count': len(transcript_text),
+            'stats': transcript_data.get('stats', {})
+        }
+        
+        results['translations'].append(translation_data)
+        journal.write(dumps_line(translation_data))
+        journal.flush()
+        
+        print(f"  Saved {target_lang} {'subtitle' if is_native else 'translation'} for {post_id} "
+              f"({len(translated_text)} chars)")
+        return True
+    
+    journal = open(journal_path, 'ab' if update_mode else 'wb')
+    
+    try:
+        # Download native subtitles, falling back to the service when one can't be used
+        if native_jobs:
+            print(f"\nDownloading {len(native_jobs)} native TikTok subtitles ({max_workers} workers)...")
+            ensure_pool_size(_subtitle_session, max_workers)
+            
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                subtitle_texts = executor.map(
+                    lambda job: _download_transcript(job[3]['Url']), native_jobs
                 )
                 
-                results['service_translated'] += 1
-                results['translations_created'] += 1
-                
-                # Save individual translation file
-                translation_file = output_dir / f"{post_id}.{target_lang}.txt"
-                with open(translation_file, 'w', encoding='utf-8') as f:
-                    f.write(f"Post ID: {post_id}\n")
-                    f.write(f"Description: {transcript_data.get('description', '')}\n")
-                    f.write(f"Original Language: {original_language}\n")
-                    f.write(f"Target Language: {target_lang}\n")
-                    f.write(f"Translation Service: {service}\n")
-                    f.write(f"\n{translated_text}\n")
-                
-                # Store translation data
-                translation_data = {
-                    'post_id': post_id,
-                    'description': transcript_data.get('description', ''),
-                    'create_time': transcript_data.get('create_time', 0),
-                    'source_language': original_language,
-                    'target_language': target_lang,
-                    'translation_service': service,
-                    'is_native_subtitle': False,
-                    'original_text': transcript_text,
-                    'translated_text': translated_text,
-                    'character_count': len(transcript_text),
-                    'stats': transcript_data.get('stats', {})
-                }
-                
-                results['translations'].append(translation_data)
-                
-                print(f"    Saved translation ({len(translated_text)} chars)")
-                
+                for job, subtitle_text in zip(native_jobs, subtitle_texts):
+                    transcript_data, original_language, target_lang, _ = job
+                    
+                    if not subtitle_text:
+                        print(f"  X Could not use TikTok subtitle for {transcript_data.get('post_id')}, "
+                              f"translating instead")
+                        queue_service_job(transcript_data, original_language, target_lang)
+                        continue
+                    
+                    if save_translation(transcript_data, original_language, target_lang, subtitle_text, True):
+                        results['tiktok_subtitles_used'] += 1
+            
+            # Subtitles that couldn't be used are translated instead, which the estimate didn't include
+            total_characters, _ = billed_characters()
+            if total_characters > results['total_characters']:
+                additional = total_characters - results['total_characters']
+                results['total_characters'] = total_characters
+                results['estimated_cost'] = translation_service.estimate_cost(total_characters)
+                print(f"\nAdditional {additional:,} characters to translate in place of unusable subtitles")
+                print(f"  Revised estimated cost: ${results['estimated_cost']:.4f} USD")
+        
+        for transcript_data, original_language, target_lang, translated_text in cached_jobs:
+            if save_translation(transcript_data, original_language, target_lang, translated_text, False):
+                results['cached_translations'] += 1
+        
+        def translate_job(batch):
+            # Returns (outcomes, batch error); the error is set when the texts had to be re-sent
+            _, original_language, target_lang = batch[0]
+            texts = [transcript_data.get('transcript', '') for transcript_data, _, _ in batch]
+            try:
+                return [(text, None) for text in translation_service.translate_batch(
+                    texts, original_language, target_lang
+                )], None
             except Exception as e:
-                print(f"    X Translation failed: {e}")
-                results['failed'] += 1
-                continue
+                if len(texts) == 1:
+                    return [(None, e)], None
+                batch_error = e
+            
+            # Retry one at a time so a single bad transcript doesn't fail the whole batch
+            outcomes = []
+            for text in texts:
+                try:
+                    outcomes.append((translation_service.translate(text, original_language, target_lang), None))
+                except Exception as e:
+                    outcomes.append((None, e))
+            return outcomes, batch_error
+        
+        # Translate concurrently (each call is a network round-trip to the service)
+        if jobs:
+            # Identical text in the same language pair is sent once and shared by every post that has it
+            copies: Dict[Tuple[str, str, str], List[Tuple[Dict, str, str]]] = {}
+            for job in jobs:
+                copies.setdefault((job[0].get('transcript', ''), job[1], job[2]), []).append(job)
+            unique_jobs = [group[0] for group in copies.values()]
+            
+            batches = _pack_batches(unique_jobs) if batch_requests else [[job] for job in unique_jobs]
+            print(f"\nTranslating {len(jobs)} transcripts with {service} "
+                  f"({len(unique_jobs)} unique, {len(batches)} requests, {max_workers} workers)...")
+            
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                batch_outcomes = executor.map(translate_job, batches)
+                
+                for batch, (outcomes, batch_error) in zip(batches, batch_outcomes):
+                    if batch_error is not None:
+                        # The batch request may already have been billed, so this text can be paid for twice
+                        resent = sum(len(job[0].get('transcript', '')) for job in batch)
+                        results['retried_characters'] += resent
+                        print(f"  ! Batch of {len(batch)} transcripts failed ({batch_error}); "
+                              f"re-sent {resent:,} characters one at a time")
+                    
+                    for job, (translated_text, error) in zip(batch, outcomes):
+                        transcript_data, original_language, target_lang = job
+                        transcript_text = transcript_data.get('transcript', '')
+                        
+                        for copy_data, _, _ in copies[(transcript_text, original_language, target_lang)]:
+                            if error is not None:
+                                print(f"  X Translation of {copy_data.get('post_id')} to {target_lang} "
+                                      f"failed: {error}")
+                                results['failed'] += 1
+                                continue
+                            
+                            if save_translation(copy_data, original_language, target_lang, translated_text, False):
+                                results['service_translated'] += 1
+                        
+                        if cache is not None and error is None:
+                            cache.set(
+                                'translation',
+                                _translation_cache_params(transcript_text, original_language, target_lang),
+                                translated_text
+                            )
+    finally:
+        journal.close()
+    
+    # Results arrive grouped by source (existing, native, cached, service batches);
+    # put them back in transcript and target language order so the file is stable
+    transcript_order = {t.get('post_id'): i for i, t in enumerate(transcripts)}
+    language_order = {lang: i for i, lang in enumerate(target_languages)}
+    results['translations'].sort(key=lambda t: (
+        transcript_order.get(t.get('post_id'), len(transcript_order)),
+        language_order.get(t.get('target_language'), len(language_order))
+    ))
     
     # Save JSON with all translation data
-    with open(translations_json_path, 'w', encoding='utf-8') as f:
-        json.dump({
-            'username': username,
-            'target_languages': target_languages,
-            'translation_service': service,
-            'summary': {
-                'total_transcripts': results['total_transcripts'],
-                'translations_created': results['translations_created'],
-                'service_translated': results['service_translated'],
-                'tiktok_subtitles_used': results['tiktok_subtitles_used'],
-                'failed': results['failed'],
-                'estimated_cost': results['estimated_cost']
-            },
-            'translations': results['translations']
-        }, f, indent=2, ensure_ascii=False)
+    write_json(translations_json_path, {
+        'username': username,
+        'target_languages': target_languages,
+        'translation_service': service,
+        'summary': {
+            'total_transcripts': results['total_transcripts'],
+            'translations_created': results['translations_created'],
+            'service_translated': results['service_translated'],
+            'tiktok_subtitles_used': results['tiktok_subtitles_used'],
+            'cached_translations': results['cached_translations'],
+            'failed': results['failed'],
+            'estimated_cost': results['estimated_cost'],
+            'retried_characters': results['retried_characters']
+        },
+        'translations': results['translations']
+    })
+    
+    journal_path.unlink(missing_ok=True)
     
     print(f"\n\nSaved translation data to {translations_json_path}")
     print(f"\nSummary:")
     print(f"  Total transcripts: {results['total_transcripts']}")
     print(f"  Translations created: {results['translations_created']}")
     print(f"  Service translated: {results['service_translated']}")
+    print(f"  From cache: {results['cached_translations']}")
+    if results['retried_characters'] > 0:
+        print(f"  Re-sent after failed batches: {results['retried_characters']:,} characters "
+              f"(may be billed twice, not in the estimate)")
     print(f"  TikTok subtitles used: {results['tiktok_subtitles_used']}")
     print(f"  Failed: {results['failed']}")
     print(f"  Skipped (existing): {results['skipped_existing']}")